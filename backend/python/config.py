@@ -5,48 +5,133 @@ from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 
+_ENV_PATH = Path(__file__).parent.parent.parent / ".env"
+
+# Snapshot of .env + os.environ, built on first Config() construction
+_ENV_CACHE: Optional[dict[str, str]] = None
+
+
+def _load_env_cache() -> dict[str, str]:
+    """Parse the project .env file once and snapshot the environment."""
+    if _ENV_PATH.exists():
+        load_dotenv(_ENV_PATH, override=False)
+    return dict(os.environ)
+
+
+def _bool_env(env: dict[str, str], key: str, default: str) -> bool:
+    """Interpret an environment value as a boolean flag."""
+    return env.get(key, default).lower() in ("1", "true", "yes")
+
+
+def _int_env(env: dict[str, str], key: str, default: str, errors: list[str]) -> int:
+    """Interpret an environment value as an integer.
+
+    A malformed value is recorded in `errors` (reported by Config.validate)
+    and the default is used instead, so construction never raises.
+    """
+    value = env.get(key, default)
+    try:
+        return int(value)
+    except ValueError:
+        errors.append(f"{key} must be an integer, got {value!r}")
+        return int(default)
+
 
 class Config:
     """Load and manage configuration from environment variables."""
 
     def __init__(self):
         """Initialize config from .env file and environment."""
-        # Load .env file from project root
-        env_path = Path(__file__).parent.parent.parent / ".env"
-        if env_path.exists():
-            load_dotenv(env_path)
+        global _ENV_CACHE
+        if _ENV_CACHE is None:
+            _ENV_CACHE = _load_env_cache()
+        env = _ENV_CACHE
+
+        # Malformed values found while parsing, reported by validate()
+        self._env_errors: list[str] = []
 
         # LLM Configuration
-        self.llm_base_url = os.getenv("LLM_BASE_URL", "https://api.anthropic.com/v1")
-        self.llm_api_key = os.getenv("LLM_API_KEY", "")
-        self.llm_model = os.getenv("LLM_MODEL", "claude-3-5-sonnet-20241022")
-        self.llm_send_api_key = os.getenv("LLM_SEND_API_KEY", "true").lower() == "true"
+        self.llm_base_url = env.get("LLM_BASE_URL", "https://api.anthropic.com/v1")
+        self.llm_api_key = env.get("LLM_API_KEY", "")
+        self.llm_model = env.get("LLM_MODEL", "claude-3-5-sonnet-20241022")
+        self.llm_send_api_key = _bool_env(env, "LLM_SEND_API_KEY", "true")
+        self.llm_concurrency = _int_env(env, "LLM_CONCURRENCY", "8", self._env_errors)
+        # Seconds a cached LLM response stays valid; 0 disables the cache
+        self.llm_cache_ttl = _int_env(env, "LLM_CACHE_TTL", "604800", self._env_errors)
+        # Upper bound on documentation characters sent in one prompt
+        self.max_content_chars = _int_env(
+            env, "MAX_CONTENT_CHARS", "50000", self._env_errors
+        )
 
         # GitHub Configuration
-        self.github_token = os.getenv("GITHUB_TOKEN", "")
-        self.github_org = os.getenv("GITHUB_ORG", "ai-open-source")
-        self.github_repo = os.getenv("GITHUB_REPO", "ai-skillls")
+        self.github_token = env.get("GITHUB_TOKEN", "")
+        self.github_org = env.get("GITHUB_ORG", "ai-open-source")
+        self.github_repo = env.get("GITHUB_REPO", "ai-skillls")
 
         # Execution Configuration
-        self.debug = os.getenv("DEBUG", "false").lower() == "true"
-        self.dry_run = os.getenv("DRY_RUN", "false").lower() == "true"
+        self.debug = _bool_env(env, "DEBUG", "false")
+        self.dry_run = _bool_env(env, "DRY_RUN", "false")
+        self.fetch_concurrency = _int_env(
+            env,
+            "FETCH_CONCURRENCY",
+            str(min(32, 4 * (os.cpu_count() or 1))),
+            self._env_errors,
+        )
 
         # Paths
         self.project_root = Path(__file__).parent.parent.parent
         self.skills_dir = self.project_root / "packages" / "skills-registry" / "skills"
         self.snapshots_dir = self.project_root / "backend" / "snapshots"
         self.sources_dir = self.project_root / "backend" / "sources"
+        self.llm_cache_dir = self.project_root / ".llm_cache"
 
         # Ensure snapshot directory exists
         self.snapshots_dir.mkdir(parents=True, exist_ok=True)
 
+        # Memoized SKILLS.md paths, keyed by skill name
+        self._skill_md_paths: dict[str, Path] = {}
+
+    def skill_md_path(self, skill_name: str) -> Path:
+        """Get the SKILLS.md path for a skill, building it once per name.
+
+        Args:
+            skill_name: Skill name
+
+        Returns:
+            Path to the skill's SKILLS.md
+        """
+        path = self._skill_md_paths.get(skill_name)
+        if path is None:
+            path = self.skills_dir / skill_name / "SKILLS.md"
+            self._skill_md_paths[skill_name] = path
+        return path
+
+    @classmethod
+    def refresh_env_cache(cls) -> None:
+        """Re-read .env and os.environ into the cache used by new instances.
+
+        Call this after mutating environment variables (e.g. in tests).
+        """
+        global _ENV_CACHE
+        _ENV_CACHE = _load_env_cache()
+
+    def load_env(self, env_path: Path) -> None:
+        """Load an additional .env file and re-read configuration from it.
+
+        Args:
+            env_path: Path to .env file
+        """
+        load_dotenv(env_path, override=True)
+        self.refresh_env_cache()
+        self.__init__()
+
     def validate(self) -> tuple[bool, list[str]]:
         """Validate required configuration.
 
         Returns:
             Tuple of (is_valid, list_of_errors)
         """
-        errors = []
+        errors = list(self._env_errors)
 
         if not self.llm_base_url:
             errors.append("LLM_BASE_URL not set")
@@ -54,6 +139,14 @@ class Config:
             errors.append("LLM_API_KEY not set (required when LLM_SEND_API_KEY=true)")
         if not self.llm_model:
             errors.append("LLM_MODEL not set")
+        if self.llm_concurrency < 1:
+            errors.append("LLM_CONCURRENCY must be at least 1")
+        if self.max_content_chars < 1:
+            errors.append("MAX_CONTENT_CHARS must be at least 1")
+        if self.llm_cache_ttl < 0:
+            errors.append("LLM_CACHE_TTL must not be negative")
+        if self.fetch_concurrency < 1:
+            errors.append("FETCH_CONCURRENCY must be at least 1")
         if not self.skills_dir.exists():
             errors.append(f"Skills directory not found: {self.skills_dir}")
 
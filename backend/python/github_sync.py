@@ -1,8 +1,9 @@
 """GitHub synchronization for committing and pushing skill updates."""
 
+import os
 import subprocess
+import time
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
 from config import Config, get_config
 
@@ -10,6 +11,9 @@ from config import Config, get_config
 class GitHubSync:
     """Handle git commits and GitHub pushes for skill updates."""
 
+    BOT_EMAIL = "41898282+github-actions[bot]@users.noreply.github.com"
+    BOT_NAME = "github-actions[bot]"
+
     def __init__(self, config: Optional[Config] = None, verbose: bool = False):
         """Initialize GitHub sync.
 
@@ -19,35 +23,52 @@ class GitHubSync:
         """
         self.config = config or get_config()
         self.verbose = verbose
+        self._git_prefix = ("git", "-C", str(self.config.project_root))
+
+        # Skills staged for the next batched commit: (skill_name, sources)
+        self._staged: list[tuple[str, list[str]]] = []
+        self._identity_set = False
+        # Environment for git subprocesses (None inherits os.environ)
+        self._git_env: Optional[dict[str, str]] = None
 
-    def run_git_command(self, *args) -> tuple[int, str, str]:
+    def run_git_command(self, *args, capture: bool = True) -> tuple[int, str, str]:
         """Run git command.
 
         Args:
             *args: Git command arguments
+            capture: Capture stdout; pass False for commands whose output
+                is ignored so no stdout pipe is allocated
 
         Returns:
             Tuple of (return_code, stdout, stderr)
         """
-        cmd = ["git", "-C", str(self.config.project_root)] + list(args)
+        cmd = (*self._git_prefix, *args)
         cwd = self.config.project_root
 
         if self.verbose:
             print(f'[Git] Running: {" ".join(cmd)}')
 
+        # Python fds are non-inheritable by default (PEP 446), so skipping
+        # the close-all-fds pass in the child is safe
         result = subprocess.run(
             cmd,
             cwd=cwd,
-            capture_output=True,
-            text=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            close_fds=False,
+            env=self._git_env,
         )
 
-        if self.verbose and result.stdout:
-            print(f"[Git] stdout: {result.stdout.strip()}")
-        if result.stderr and result.returncode != 0:
-            print(f"[Git] stderr: {result.stderr.strip()}")
+        stdout = result.stdout.decode("utf-8", "replace") if result.stdout else ""
+        stderr = result.stderr.decode("utf-8", "replace") if result.stderr else ""
 
-        return result.returncode, result.stdout, result.stderr
+        if self.verbose and stdout:
+            print(f"[Git] stdout: {stdout.strip()}")
+        if stderr and result.returncode != 0:
+            print(f"[Git] stderr: {stderr.strip()}")
+
+        return result.returncode, stdout, stderr
 
     def is_git_repo(self) -> bool:
         """Check if directory is a git repository.
@@ -55,7 +76,7 @@ class GitHubSync:
         Returns:
             True if git repo
         """
-        code, _, _ = self.run_git_command("rev-parse", "--git-dir")
+        code, _, _ = self.run_git_command("rev-parse", "--git-dir", capture=False)
         return code == 0
 
     def has_changes(self, path: Optional[Path] = None) -> bool:
@@ -68,7 +89,7 @@ class GitHubSync:
             True if changes exist
         """
         if path:
-            code, _, _ = self.run_git_command("status", "--porcelain", str(path))
+            code, out, _ = self.run_git_command("status", "--porcelain", str(path))
         else:
             code, out, _ = self.run_git_command("status", "--porcelain")
 
@@ -86,7 +107,7 @@ class GitHubSync:
         Returns:
             Success
         """
-        code, _, _ = self.run_git_command("add", str(path))
+        code, _, _ = self.run_git_command("add", str(path), capture=False)
         return code == 0
 
     def add_all_changes(self) -> bool:
@@ -95,7 +116,7 @@ class GitHubSync:
         Returns:
             Success
         """
-        code, _, _ = self.run_git_command("add", "-A")
+        code, _, _ = self.run_git_command("add", "-A", capture=False)
         return code == 0
 
     def commit(self, message: str) -> bool:
@@ -107,7 +128,7 @@ class GitHubSync:
         Returns:
             Success
         """
-        code, _, _ = self.run_git_command("commit", "-m", message)
+        code, _, _ = self.run_git_command("commit", "-m", message, capture=False)
         return code == 0
 
     def create_branch(self, branch_name: str) -> bool:
@@ -119,11 +140,11 @@ class GitHubSync:
         Returns:
             Success
         """
-        code1, _, _ = self.run_git_command("checkout", "-b", branch_name)
+        code1, _, _ = self.run_git_command("checkout", "-b", branch_name, capture=False)
 
         if code1 != 0:
             # Branch might already exist, try to checkout
-            code2, _, _ = self.run_git_command("checkout", branch_name)
+            code2, _, _ = self.run_git_command("checkout", branch_name, capture=False)
             return code2 == 0
 
         return code1 == 0
@@ -137,54 +158,115 @@ class GitHubSync:
         Returns:
             Success
         """
-        code, _, _ = self.run_git_command("push", "origin", branch_name, "-f")
+        code, _, _ = self.run_git_command(
+            "push", "origin", branch_name, "-f", capture=False
+        )
         return code == 0
 
-    def commit_skill(self, skill_name: str, sources: list[str]) -> bool:
-        """Commit a single skill with appropriate message.
+    def ensure_identity(self) -> None:
+        """Make sure commits have an author (CI runners may not have one).
+
+        Checks once per instance whether git already has user.email and
+        user.name; if either is missing, the bot identity is supplied
+        through GIT_AUTHOR_*/GIT_COMMITTER_* in the git subprocess
+        environment instead of writing it to the repository config.
+        """
+        if self._identity_set:
+            return
+
+        # git commit refuses to run if either key is unset
+        missing = False
+        for key in ("user.email", "user.name"):
+            code, out, _ = self.run_git_command("config", "--get", key)
+            if code != 0 or not out.strip():
+                missing = True
+                break
+
+        if missing:
+            self._git_env = {
+                **os.environ,
+                "GIT_AUTHOR_NAME": self.BOT_NAME,
+                "GIT_AUTHOR_EMAIL": self.BOT_EMAIL,
+                "GIT_COMMITTER_NAME": self.BOT_NAME,
+                "GIT_COMMITTER_EMAIL": self.BOT_EMAIL,
+            }
+
+        self._identity_set = True
+
+    def stage_skill(self, skill_name: str, sources: list[str]) -> None:
+        """Queue a regenerated skill for the next batched commit.
 
         Args:
             skill_name: Skill name
             sources: List of source URLs
+        """
+        self._staged.append((skill_name, sources))
+
+    def commit_staged(self) -> bool:
+        """Add and commit all staged skills with a single git add + commit.
 
         Returns:
-            Success
+            Success (True when nothing is staged)
         """
-        skill_path = self.config.skills_dir / skill_name / "SKILLS.md"
+        if not self._staged:
+            return True
 
-        if not self.add_file(skill_path):
-            print(f"[Git] Failed to add {skill_name} skill")
+        # Workers finish in any order; keep paths and message deterministic
+        staged = sorted(self._staged, key=lambda item: item[0])
+        paths = [str(self.config.skill_md_path(skill_name)) for skill_name, _ in staged]
+
+        code, _, _ = self.run_git_command("add", "-A", "--", *paths, capture=False)
+        if code != 0:
+            print(f"[Git] Failed to add {len(paths)} skill(s)")
             return False
 
-        # Ensure git user identity is set (CI runners may not have it)
-        self.run_git_command(
-            "config",
-            "user.email",
-            "41898282+github-actions[bot]@users.noreply.github.com",
-        )
-        self.run_git_command("config", "user.name", "github-actions[bot]")
+        self.ensure_identity()
 
         # Create meaningful commit message
-        sources_str = ", ".join([s.split("/")[-1] for s in sources[:2]])
-        message = f"docs(skills): regenerate {skill_name} from {sources_str}"
+        if len(staged) == 1:
+            skill_name, sources = staged[0]
+            sources_str = ", ".join([s.split("/")[-1] for s in sources[:2]])
+            message = f"docs(skills): regenerate {skill_name} from {sources_str}"
+        else:
+            names = ", ".join(skill_name for skill_name, _ in staged)
+            message = f"docs(skills): regenerate {len(staged)} skills ({names})"
 
         if not self.commit(message):
-            print(f"[Git] Failed to commit {skill_name}")
+            print(f"[Git] Failed to commit {len(staged)} skill(s)")
             return False
 
+        # Kept staged until committed, so a failed add/commit can be retried
+        self._staged = []
+
         if self.verbose:
-            print(f"[Git] Committed {skill_name}")
+            print(f"[Git] Committed {len(staged)} skill(s)")
 
         return True
 
-    def create_pr_branch(self) -> str:
+    def commit_skill(self, skill_name: str, sources: list[str]) -> bool:
+        """Commit a single skill with appropriate message.
+
+        Args:
+            skill_name: Skill name
+            sources: List of source URLs
+
+        Returns:
+            Success
+        """
+        self.stage_skill(skill_name, sources)
+        return self.commit_staged()
+
+    def create_pr_branch(self, run_id: Optional[str] = None) -> str:
         """Create a feature branch for skill regeneration.
 
+        Args:
+            run_id: UTC run timestamp (YYYYmmdd_HHMMSS); defaults to now
+
         Returns:
             Branch name
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        branch_name = f"generate/skills-{timestamp}"
+        run_id = run_id or time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+        branch_name = f"generate/skills-{run_id}"
 
         if self.create_branch(branch_name):
             if self.verbose:
@@ -194,16 +276,18 @@ class GitHubSync:
         # If branch creation failed, use main
         return "main"
 
-    def push_changes(self, branch: str) -> bool:
+    def push_changes(self, branch: str, skip_check: bool = False) -> bool:
         """Push changes to remote.
 
         Args:
             branch: Branch name to push
+            skip_check: Push without first checking for changes (for callers
+                that already know commits were made)
 
         Returns:
             Success
         """
-        if not self.has_changes():
+        if not skip_check and not self.has_changes():
             if self.verbose:
                 print("[Git] No changes to push")
             return True
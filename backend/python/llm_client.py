@@ -1,15 +1,84 @@
 """Provider-agnostic LLM client for Claude, GPT, Gemini, and compatible APIs."""
 
+import asyncio
 import json
+import math
+import random
+import socket
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
 from config import Config, get_config
+import json_codec
+
+# Decodes one JSON value starting at an offset and ignores whatever follows,
+# which skips markdown fences and prose around the payload
+_RAW_DECODER = json.JSONDecoder()
+
+
+def _extract_json(text: str):
+    """Find the JSON payload inside a response wrapped in fences or prose.
+
+    Scans from the first code fence, then from the start, for the first
+    non-empty object; raw_decode stops at the end of each value, so closing
+    fences and trailing text are never parsed. Falls back to the first
+    decodable value (an empty object or a bare array).
+
+    Args:
+        text: Raw LLM response
+
+    Returns:
+        Parsed JSON value, or None if there is none
+    """
+    fence = text.find("```")
+    offsets = (fence, 0) if fence > 0 else (0,)
+    fallback = None
+
+    for bracket in ("{", "["):
+        for offset in offsets:
+            pos = text.find(bracket, offset)
+            while pos >= 0:
+                try:
+                    value, end = _RAW_DECODER.raw_decode(text, pos)
+                except json.JSONDecodeError:
+                    pos = text.find(bracket, pos + 1)
+                    continue
+                if bracket == "{" and value:
+                    return value
+                if fallback is None:
+                    fallback = value
+                pos = text.find(bracket, end)
+
+    return fallback
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that enables TCP keepalive on pooled connections."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
 
 
 class LLMClient:
     """Provider-agnostic LLM client supporting any OpenAI-compatible API."""
 
+    # HTTP statuses worth retrying; any other 4xx fails immediately
+    RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+    # Exponential backoff ceiling per attempt, in seconds
+    BACKOFF_BASE = 1.0
+    BACKOFF_CAP = 30.0
+
+    # Longest server-requested Retry-After honoured, in seconds
+    RETRY_AFTER_MAX = 60.0
+
     def __init__(self, config: Optional[Config] = None, verbose: bool = False):
         """Initialize LLM client.
 
@@ -20,17 +89,37 @@ class LLMClient:
         self.config = config or get_config()
         self.verbose = verbose
 
+        # One pooled session so repeated calls reuse the TCP/TLS connection
+        self._session = requests.Session()
+        adapter = _KeepAliveAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
         if self.verbose:
             print(
                 f"[LLM] Initialized: {self.config.llm_model} @ {self.config.llm_base_url}"
             )
 
+    def close(self) -> None:
+        """Close pooled connections held by the client's session."""
+        self._session.close()
+
+    def __enter__(self) -> "LLMClient":
+        """Use the client as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the client when leaving the context."""
+        self.close()
+
     def call(
         self,
         system_prompt: str,
         user_message: str,
         max_retries: int = 3,
         timeout: int = 60,
+        system_messages: Optional[list[dict]] = None,
+        stream: bool = False,
     ) -> Optional[str]:
         """Call LLM with provider-agnostic API.
 
@@ -39,18 +128,33 @@ class LLMClient:
             user_message: User message to process
             max_retries: Maximum retry attempts on failure
             timeout: Request timeout in seconds
+            system_messages: System prompt as text blocks, optionally marked
+                with cache_control; overrides system_prompt
+            stream: Read the response body in chunks into one buffer instead
+                of letting requests buffer it, and parse that buffer in place
 
         Returns:
             LLM response text or None on failure
         """
         headers = {
             "Content-Type": "application/json",
+            "Connection": "keep-alive",
         }
 
         # Only add API key if configured to send it
         if self.config.llm_send_api_key and self.config.llm_api_key:
             headers["Authorization"] = f"Bearer {self.config.llm_api_key}"
 
+        is_claude = "claude" in self.config.llm_model.lower()
+
+        # Claude honours cache_control on text blocks; other providers cache
+        # byte-identical prefixes on their own, so send them plain text
+        if system_messages is not None:
+            if is_claude:
+                system_prompt = system_messages
+            else:
+                system_prompt = "".join(block["text"] for block in system_messages)
+
         payload = {
             "model": self.config.llm_model,
             "messages": [
@@ -62,22 +166,37 @@ class LLMClient:
         }
 
         # Request JSON response format if supported
-        if "claude" in self.config.llm_model.lower():
+        if is_claude:
             payload["response_format"] = {"type": "json_object"}
 
         url = f"{self.config.llm_base_url}/chat/completions"
 
+        # Serialize once; retries resend the same bytes
+        body = json_codec.dumps(payload)
+
         for attempt in range(max_retries):
+            retry_after = None
+
             try:
                 if self.verbose:
                     print(f"[LLM] Request attempt {attempt + 1}/{max_retries}...")
 
-                response = requests.post(
-                    url, json=payload, headers=headers, timeout=timeout
+                response = self._session.post(
+                    url, data=body, headers=headers, timeout=timeout, stream=stream
                 )
-                response.raise_for_status()
 
-                data = response.json()
+                if stream:
+                    try:
+                        response.raise_for_status()
+                        buf = bytearray()
+                        for chunk in response.iter_content(chunk_size=8192):
+                            buf += chunk
+                    finally:
+                        response.close()
+                    data = json_codec.loads(buf)
+                else:
+                    response.raise_for_status()
+                    data = json_codec.loads(response.content)
                 content = (
                     data.get("choices", [{}])[0].get("message", {}).get("content", "")
                 )
@@ -87,27 +206,121 @@ class LLMClient:
 
                 return content
 
-            except requests.exceptions.RequestException as e:
+            except requests.exceptions.HTTPError as e:
+                status = getattr(e.response, "status_code", None)
+                if status is not None and status not in self.RETRYABLE_STATUS:
+                    print(f"[LLM] Request failed with HTTP {status}, not retrying")
+                    return None
+
                 if self.verbose:
                     print(f"[LLM] Error on attempt {attempt + 1}: {e}")
 
-                if attempt < max_retries - 1:
-                    # Exponential backoff: 2s, 4s, 8s
-                    backoff = 2**attempt
-                    if self.verbose:
-                        print(f"[LLM] Retrying in {backoff}s...")
-                    time.sleep(backoff)
-                else:
-                    print(f"[LLM] Failed after {max_retries} attempts")
-                    return None
+                retry_after = self._parse_retry_after(e.response)
+
+            except (
+                requests.exceptions.RequestException,
+                json_codec.JSONDecodeError,
+            ) as e:
+                if self.verbose:
+                    print(f"[LLM] Error on attempt {attempt + 1}: {e}")
 
+            if attempt < max_retries - 1:
+                backoff = (
+                    retry_after
+                    if retry_after is not None
+                    else self._backoff_delay(attempt)
+                )
+                if self.verbose:
+                    print(f"[LLM] Retrying in {backoff:.1f}s...")
+                time.sleep(backoff)
+
+        print(f"[LLM] Failed after {max_retries} attempts")
         return None
 
+    async def acall(
+        self,
+        system_prompt: str,
+        user_message: str,
+        max_retries: int = 3,
+        timeout: int = 60,
+        system_messages: Optional[list[dict]] = None,
+    ) -> Optional[str]:
+        """Async variant of call for fanning out requests with asyncio.gather.
+
+        Runs the pooled synchronous request in a worker thread, so concurrent
+        awaits overlap their round trips while sharing the same connections.
+
+        Args:
+            system_prompt: System prompt for context and instructions
+            user_message: User message to process
+            max_retries: Maximum retry attempts on failure
+            timeout: Request timeout in seconds
+            system_messages: System prompt as text blocks (see call)
+
+        Returns:
+            LLM response text or None on failure
+        """
+        return await asyncio.to_thread(
+            self.call,
+            system_prompt,
+            user_message,
+            max_retries,
+            timeout,
+            system_messages=system_messages,
+        )
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff so concurrent callers don't retry in lockstep.
+
+        Args:
+            attempt: Zero-based attempt number that just failed
+
+        Returns:
+            Delay in seconds, uniform in [0, min(cap, base * 2**attempt)]
+        """
+        return random.uniform(0, min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2**attempt))
+
+    @classmethod
+    def _parse_retry_after(cls, response) -> Optional[float]:
+        """Parse a Retry-After header given as seconds or an HTTP date.
+
+        Args:
+            response: HTTP response (may be None)
+
+        Returns:
+            Delay in seconds, clamped to [0, RETRY_AFTER_MAX], or None if
+            absent/unparseable
+        """
+        if response is None:
+            return None
+
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            # "-0000" zones parse as naive datetimes; HTTP dates are UTC
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+        if not math.isfinite(delay):
+            return None
+
+        return min(max(0.0, delay), cls.RETRY_AFTER_MAX)
+
     def generate_json(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         max_retries: int = 3,
+        system_messages: Optional[list[dict]] = None,
     ) -> Optional[dict]:
         """Call LLM and parse JSON response.
 
@@ -115,6 +328,7 @@ class LLMClient:
             prompt: User prompt
             system_prompt: System prompt (defaults to JSON instruction)
             max_retries: Retry attempts
+            system_messages: System prompt as text blocks (see call)
 
         Returns:
             Parsed JSON dict or None on failure
@@ -126,21 +340,25 @@ class LLMClient:
                 "Return ONLY valid JSON, no markdown or extra text."
             )
 
-        response = self.call(system_prompt, prompt, max_retries)
+        response = self.call(
+            system_prompt, prompt, max_retries, system_messages=system_messages
+        )
 
         if not response:
             return None
 
         try:
-            # Remove markdown code blocks if present
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.endswith("```"):
-                response = response[:-3]
-
-            return json.loads(response.strip())
-        except json.JSONDecodeError as e:
-            print(f"[LLM] JSON parse error: {e}")
-            if self.verbose:
-                print(f"[LLM] Raw response: {response[:200]}...")
-            return None
+            # Plain JSON is the common case; orjson fails fast on the first
+            # character when the payload is wrapped in a fence or prose
+            return json_codec.loads(response)
+        except json_codec.JSONDecodeError as e:
+            error = e
+
+        parsed = _extract_json(response)
+        if parsed is not None:
+            return parsed
+
+        print(f"[LLM] JSON parse error: {error}")
+        if self.verbose:
+            print(f"[LLM] Raw response: {response[:200]}...")
+        return None
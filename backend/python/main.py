@@ -1,8 +1,10 @@
 """Main orchestrator for skill regeneration pipeline."""
 
 import argparse
-import json
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
@@ -13,6 +15,7 @@ from source_fetcher import SourceFetcher
 from skill_validator import SkillValidator
 from skill_normalizer import SkillNormalizer
 from github_sync import GitHubSync
+import json_codec
 
 
 class SkillRegenerator:
@@ -35,6 +38,9 @@ class SkillRegenerator:
         self.dry_run = dry_run
         self.verbose = verbose
 
+        # Fixed for the whole run so branch names stay stable across stages
+        self.run_id = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+
         self.llm = LLMClient(self.config, verbose=verbose)
         self.fetcher = SourceFetcher(self.config, verbose=verbose)
         self.validator = SkillValidator()
@@ -48,6 +54,17 @@ class SkillRegenerator:
             "failed": 0,
             "errors": [],
         }
+        self._stats_lock = threading.Lock()
+
+        # Parsed .index.json skills and the mtime it was read at
+        self._registry_cache: Optional[dict] = None
+        self._registry_mtime_ns: Optional[int] = None
+
+        # Skill directories already created during this run
+        self._known_dirs: set[Path] = set()
+
+        # (skill_name, content) of written skills, snapshotted after push
+        self._pending_snapshots: list[tuple[str, str]] = []
 
     def log(self, message: str, prefix: str = "[Regen]"):
         """Print log message.
@@ -58,26 +75,55 @@ class SkillRegenerator:
         """
         print(f"{prefix} {message}")
 
-    def load_skills_registry(self) -> dict:
+    def count(self, key: str, error: Optional[str] = None):
+        """Increment a stats counter; safe to call from worker threads.
+
+        Args:
+            key: Stats key to increment
+            error: Optional error message to record
+        """
+        with self._stats_lock:
+            self.stats[key] += 1
+            if error:
+                self.stats["errors"].append(error)
+
+    def load_skills_registry(self, reload: bool = False) -> dict:
         """Load skills registry.
 
+        The parsed registry is cached and only re-read when the file's
+        mtime changes or `reload` is set.
+
+        Args:
+            reload: Ignore the cached registry and re-read the file
+
         Returns:
             Skills registry dict
         """
         registry_path = self.config.skills_dir / ".index.json"
 
-        if not registry_path.exists():
+        try:
+            mtime_ns = registry_path.stat().st_mtime_ns
+        except FileNotFoundError:
             self.log("No skills registry found", "[Error]")
             return {}
 
+        if (
+            not reload
+            and self._registry_cache is not None
+            and mtime_ns == self._registry_mtime_ns
+        ):
+            return self._registry_cache
+
         try:
-            with open(registry_path) as f:
-                data = json.load(f)
-            return data.get("skills", {})
+            data = json_codec.loads(registry_path.read_bytes())
         except Exception as e:
             self.log(f"Failed to load registry: {e}", "[Error]")
             return {}
 
+        self._registry_cache = data.get("skills", {})
+        self._registry_mtime_ns = mtime_ns
+        return self._registry_cache
+
     def save_skill_to_registry(self, skill_dict: dict, skill_name: str) -> bool:
         """Save skill to registry.
 
@@ -88,19 +134,20 @@ class SkillRegenerator:
         Returns:
             Success
         """
-        skill_dir = self.config.skills_dir / skill_name
-        skill_path = skill_dir / "SKILLS.md"
+        skill_path = self.config.skill_md_path(skill_name)
+        skill_dir = skill_path.parent
 
         if not self.dry_run:
-            skill_dir.mkdir(parents=True, exist_ok=True)
+            if skill_dir not in self._known_dirs:
+                skill_dir.mkdir(parents=True, exist_ok=True)
+                self._known_dirs.add(skill_dir)
 
             # Convert skill dict to markdown
             sources = skill_dict.get("sources", [])
             markdown = self.normalizer.skill_to_markdown(skill_dict, sources)
 
             try:
-                with open(skill_path, "w", encoding="utf-8") as f:
-                    f.write(markdown)
+                skill_path.write_bytes(markdown.encode("utf-8"))
 
                 if self.verbose:
                     self.log(f"Wrote {skill_path}")
@@ -112,19 +159,33 @@ class SkillRegenerator:
 
         return True
 
-    def regenerate_skill(
+    def load_current_skill(self, skill_name: str) -> Optional[str]:
+        """Read the skill's current SKILLS.md.
+
+        Args:
+            skill_name: Skill name
+
+        Returns:
+            Markdown content or None if it doesn't exist
+        """
+        try:
+            return self.config.skill_md_path(skill_name).read_bytes().decode("utf-8")
+        except (IOError, UnicodeDecodeError):
+            return None
+
+    def fetch_stage(
         self, skill_name: str, skill_version: Optional[str] = None
-    ) -> bool:
-        """Regenerate a single skill.
+    ) -> Optional[dict]:
+        """Pipeline stage 1: load the descriptor, fetch sources and diff them.
 
         Args:
             skill_name: Skill name
             skill_version: Optional version to use
 
         Returns:
-            Success (skill was updated or skipped)
+            Job dict for the normalize stage, or None if skipped/failed
         """
-        self.stats["processed"] += 1
+        self.count("processed")
         self.log(f"Processing {skill_name}...", "[Skill]")
 
         # Load source descriptor
@@ -132,14 +193,13 @@ class SkillRegenerator:
             source_descriptor = self.fetcher.load_source_descriptor(skill_name)
         except Exception as e:
             self.log(f"Failed to load sources for {skill_name}: {e}", "[Error]")
-            self.stats["failed"] += 1
-            self.stats["errors"].append(f"{skill_name}: {str(e)}")
-            return False
+            self.count("failed", f"{skill_name}: {str(e)}")
+            return None
 
         if not source_descriptor:
             self.log(f"No source descriptor found for {skill_name}", "[Skip]")
-            self.stats["skipped"] += 1
-            return True
+            self.count("skipped")
+            return None
 
         # Normalize source descriptor into a list of source URL strings
         source_urls = []
@@ -166,81 +226,144 @@ class SkillRegenerator:
 
         # Fetch source content
         try:
-            content = self.fetcher.fetch_sources(skill_name)
+            fetched = self.fetcher.collect_sources(skill_name)
         except Exception as e:
             self.log(f"Failed to fetch sources for {skill_name}: {e}", "[Error]")
-            self.stats["failed"] += 1
-            self.stats["errors"].append(f"{skill_name} sources: {str(e)}")
-            return False
+            self.count("failed", f"{skill_name} sources: {str(e)}")
+            return None
 
-        if not content:
+        if not fetched:
             self.log(f"No content fetched for {skill_name}", "[Skip]")
-            self.stats["skipped"] += 1
-            return True
+            self.count("skipped")
+            return None
+
+        content = fetched.text
+        if self.verbose:
+            self.log(f"Fetched {fetched.byte_size} bytes for {skill_name}", "[Fetch]")
 
         # Compute diff
-        diff = self.fetcher.compute_diff(skill_name, content)
+        change = self.fetcher.compute_change(skill_name, content)
 
-        if diff is None:
+        if change is None:
             self.log(f"No changes detected for {skill_name}", "[Skip]")
-            self.stats["skipped"] += 1
-            return True
+            self.count("skipped")
+            return None
+
+        diff, is_diff = change
+
+        # A diff only makes sense next to the skill it updates; without the
+        # current SKILLS.md, regenerate from the full content instead
+        previous_skill = self.load_current_skill(skill_name) if is_diff else None
+        if is_diff and not previous_skill:
+            diff, is_diff = content, False
+
+        self.log(
+            f"Changes detected ({len(diff)} chars{', as diff' if is_diff else ''})",
+            "[Skill]",
+        )
+
+        return {
+            "skill_name": skill_name,
+            "skill_version": skill_version
+            or source_descriptor.get("version", "unknown"),
+            "source_urls": source_urls,
+            "content": content,
+            "content_urls": fetched.urls,
+            "diff": diff,
+            "previous_skill": previous_skill,
+        }
 
-        if not isinstance(diff, str):
-            # diff is True (changed), use full content
-            diff = content
+    def normalize_stage(self, job: dict) -> Optional[dict]:
+        """Pipeline stage 2: normalize the changed content via the LLM.
 
-        self.log(f"Changes detected ({len(diff)} chars)", "[Skill]")
+        Args:
+            job: Job dict from fetch_stage
 
-        # Normalize via LLM
-        skill_version = skill_version or source_descriptor.get("version", "unknown")
+        Returns:
+            Job dict with "normalized" set, or None on failure
+        """
+        skill_name = job["skill_name"]
 
         try:
             normalized = self.normalizer.normalize(
-                diff,
+                job["diff"],
                 skill_name,
-                skill_version,
-                sources=source_urls,
+                job["skill_version"],
+                sources=job["source_urls"],
+                pre_extracted_urls=job["content_urls"],
+                previous_skill=job["previous_skill"],
             )
         except Exception as e:
             self.log(f"Failed to normalize {skill_name}: {e}", "[Error]")
-            self.stats["failed"] += 1
-            self.stats["errors"].append(f"{skill_name} normalize: {str(e)}")
-            return False
+            self.count("failed", f"{skill_name} normalize: {str(e)}")
+            return None
 
         if not normalized:
             self.log(f"LLM returned invalid skill for {skill_name}", "[Error]")
-            self.stats["failed"] += 1
-            self.stats["errors"].append(f"{skill_name}: Invalid LLM output")
-            return False
+            self.count("failed", f"{skill_name}: Invalid LLM output")
+            return None
+
+        return {**job, "normalized": normalized}
+
+    def write_stage(self, job: dict) -> bool:
+        """Pipeline stage 3: validate, write SKILLS.md and stage the commit.
+
+        Args:
+            job: Job dict from normalize_stage
+
+        Returns:
+            Success
+        """
+        skill_name = job["skill_name"]
+        normalized = job["normalized"]
 
         # Validate
         is_valid, errors, warnings = self.validator.validate_skill(normalized)
 
         if not is_valid:
             self.log(f"Validation failed for {skill_name}: {errors[0]}", "[Error]")
-            self.stats["failed"] += 1
-            self.stats["errors"].append(f"{skill_name} validation: {errors[0]}")
+            self.count("failed", f"{skill_name} validation: {errors[0]}")
             return False
 
         # Save to registry
         if not self.save_skill_to_registry(normalized, skill_name):
-            self.stats["failed"] += 1
+            self.count("failed")
             return False
 
-        # Commit to git
-        sources = source_urls
-
-        if not self.dry_run and not self.git.commit_skill(skill_name, sources):
-            self.log(f"Failed to commit {skill_name}", "[Git]")
-            self.stats["failed"] += 1
-            return False
+        # Stage for the batched commit at the end of the run; the sources are
+        # snapshotted only once that commit is pushed (see save_snapshots)
+        if not self.dry_run:
+            self.git.stage_skill(skill_name, job["source_urls"])
+            with self._stats_lock:
+                self._pending_snapshots.append((skill_name, job["content"]))
 
-        self.stats["updated"] += 1
+        self.count("updated")
         self.log(f"✓ Updated {skill_name}", "[Skill]")
 
         return True
 
+    def regenerate_skill(
+        self, skill_name: str, skill_version: Optional[str] = None
+    ) -> bool:
+        """Regenerate a single skill by running all pipeline stages in turn.
+
+        Args:
+            skill_name: Skill name
+            skill_version: Optional version to use
+
+        Returns:
+            Success (skill was updated or skipped)
+        """
+        failed_before = self.stats["failed"]
+
+        job = self.fetch_stage(skill_name, skill_version)
+        if job is not None:
+            job = self.normalize_stage(job)
+        if job is not None:
+            return self.write_stage(job)
+
+        return self.stats["failed"] == failed_before
+
     def regenerate_skills(self, skill_names: list[str]) -> int:
         """Regenerate multiple skills.
 
@@ -271,34 +394,96 @@ class SkillRegenerator:
         branch = "main"
 
         if not self.dry_run:
-            branch = self.git.create_pr_branch()
+            branch = self.git.create_pr_branch(self.run_id)
 
-        for skill_name in skill_names:
-            try:
-                self.regenerate_skill(skill_name)
-            except KeyboardInterrupt:
-                self.log("Interrupted by user", "[Warn]")
-                break
-            except Exception as e:
-                self.log(f"Unexpected error for {skill_name}: {e}", "[Error]")
-                self.stats["failed"] += 1
-                self.stats["errors"].append(f"{skill_name}: {str(e)}")
+        self.run_pipeline(skill_names)
 
-        # Push changes
+        # Commit all regenerated skills at once
+        if not self.dry_run and self.stats["updated"] > 0:
+            if not self.git.commit_staged():
+                self.log("Failed to commit regenerated skills", "[Error]")
+                return 1
+
+        # Push changes (updated > 0 already implies there are commits to push)
         if not self.dry_run and self.stats["updated"] > 0:
             self.log(f"Pushing changes to {branch}...", "[Git]")
 
-            if self.git.push_changes(branch):
+            if self.git.push_changes(branch, skip_check=True):
                 self.log(f"Pushed to {branch}", "[Git]")
             else:
                 self.log("Failed to push changes", "[Error]")
                 return 1
 
+            self.save_snapshots()
+
         # Print summary
         self.print_summary()
 
         return 1 if self.stats["failed"] > 0 else 0
 
+    def run_pipeline(self, skill_names: list[str]) -> None:
+        """Run fetch, normalize and write stages on separate worker pools.
+
+        Each finished stage hands its job to the next pool, so the LLM call
+        for one skill overlaps the fetch of the next and the write of the
+        previous one.
+
+        Args:
+            skill_names: Skill names to regenerate
+        """
+        fetch_pool = ThreadPoolExecutor(max_workers=self.config.fetch_concurrency)
+        llm_pool = ThreadPoolExecutor(max_workers=self.config.llm_concurrency)
+        write_pool = ThreadPoolExecutor(max_workers=2)
+        pools = (fetch_pool, llm_pool, write_pool)
+
+        pending = {
+            fetch_pool.submit(self.fetch_stage, skill_name): ("fetch", skill_name)
+            for skill_name in skill_names
+        }
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    stage, skill_name = pending.pop(future)
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.log(f"Unexpected error for {skill_name}: {e}", "[Error]")
+                        self.count("failed", f"{skill_name}: {str(e)}")
+                        continue
+
+                    # None means the stage already recorded a skip or failure
+                    if result is None:
+                        continue
+
+                    if stage == "fetch":
+                        next_future = llm_pool.submit(self.normalize_stage, result)
+                        pending[next_future] = ("normalize", skill_name)
+                    elif stage == "normalize":
+                        next_future = write_pool.submit(self.write_stage, result)
+                        pending[next_future] = ("write", skill_name)
+        except KeyboardInterrupt:
+            self.log("Interrupted by user", "[Warn]")
+            for pool in pools:
+                pool.shutdown(wait=False, cancel_futures=True)
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+
+    def save_snapshots(self) -> None:
+        """Snapshot the sources of every skill written this run.
+
+        Called only after the regenerated skills are committed and pushed:
+        a snapshot makes the next run skip unchanged sources, so saving it
+        before then would strand a skill whose commit failed.
+        """
+        for skill_name, content in self._pending_snapshots:
+            self.fetcher.save_snapshot(skill_name, content)
+        self._pending_snapshots = []
+
     def print_summary(self):
         """Print execution summary."""
         self.log("", "[---]")
@@ -364,7 +549,8 @@ def main():
         verbose=args.verbose,
     )
 
-    exit_code = regenerator.regenerate_skills(skill_names)
+    with regenerator.llm:
+        exit_code = regenerator.regenerate_skills(skill_names)
     sys.exit(exit_code)
 
 
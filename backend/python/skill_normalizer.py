@@ -1,16 +1,43 @@
 """Normalize documentation through LLM into structured SKILLS.md content."""
 
+import hashlib
 import json
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Optional
 from llm_client import LLMClient
 from skill_validator import SkillValidator
 from config import Config, get_config
+from source_fetcher import URL_RE, TRUNCATION_MARKER
+import json_codec
+
+# (skill key, SKILLS.md heading) for each list section
+_MD_SECTIONS = (
+    ("principles", "Principles"),
+    ("rules", "Mandatory Rules"),
+    ("patterns", "Recommended Patterns"),
+    ("anti_patterns", "Anti-Patterns"),
+    ("security", "Security"),
+    ("performance", "Performance"),
+    ("tooling", "Tooling"),
+)
+
+
+def _iso_now() -> str:
+    """Current UTC time as YYYY-MM-DDTHH:MM:SSZ."""
+    d = datetime.now(timezone.utc)
+    return (
+        f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+        f"T{d.hour:02d}:{d.minute:02d}:{d.second:02d}Z"
+    )
 
 
 class SkillNormalizer:
     """Normalize raw documentation into structured skills using LLM."""
 
+    __slots__ = ("llm", "config", "validator", "verbose")
+
     SYSTEM_PROMPT = """You are a technical documentation expert specializing in extracting actionable best practices.
 
 Your task: Extract and normalize provided documentation into a structured JSON format.
@@ -46,6 +73,24 @@ Return this JSON:
   "tooling": ["tool1", ...] or []
 }"""
 
+    DIFF_PROMPT_ADDENDUM = """
+
+The current skill is given in <current_skill>, and the documentation it was generated
+from is given as a unified diff in <documentation_diff>. Lines starting with "+" are
+new or changed, lines starting with "-" were removed and must not be used, other lines
+are unchanged context. Keep every item of the current skill that the diff does not
+contradict, and add or update items from the changed lines.
+Still return the complete JSON object described above."""
+
+    # Static system prompt block shared by every call; marking it cacheable
+    # lets the provider reuse the prefix instead of re-reading it per skill
+    _SYSTEM_STATIC = {
+        "type": "text",
+        "text": SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+    _SYSTEM_DIFF = {"type": "text", "text": DIFF_PROMPT_ADDENDUM}
+
     def __init__(
         self,
         llm: Optional[LLMClient] = None,
@@ -77,6 +122,9 @@ Return this JSON:
         skill_name: str,
         skill_version: str = "unknown",
         sources: Optional[list[str]] = None,
+        pre_extracted_urls: Optional[list[str]] = None,
+        previous_skill: Optional[str] = None,
+        force_refresh: bool = False,
     ) -> Optional[dict]:
         """Normalize documentation to structured skill.
 
@@ -84,6 +132,13 @@ Return this JSON:
             content: Raw documentation content
             skill_name: Skill name (e.g., 'react')
             skill_version: Version string
+            sources: Source URLs to record in the skill
+            pre_extracted_urls: URLs already found in the content, used when
+                sources is empty instead of scanning the content again
+            previous_skill: Current SKILLS.md for the skill; when given,
+                content is a unified diff against the last snapshot and the
+                skill is updated from it rather than rebuilt
+            force_refresh: Ignore any cached LLM response for this prompt
 
         Returns:
             Normalized skill dict or None on failure
@@ -92,15 +147,33 @@ Return this JSON:
             print(f"[Normalize] No content provided for {skill_name}")
             return None
 
-        # Truncate very long content to fit token limits
-        max_chars = 50000
+        # Truncate very long content to fit token limits; fetched sources
+        # are already bounded at source boundaries by the fetcher
+        max_chars = self.config.max_content_chars
         if len(content) > max_chars:
-            content = content[:max_chars] + "\n\n[... content truncated ...]"
+            content = content[:max_chars] + TRUNCATION_MARKER
             if self.verbose:
                 print(f"[Normalize] Content truncated to {max_chars} chars")
 
         # Create user prompt
-        user_prompt = f"""Extract best practices for {skill_name} from this documentation:
+        if previous_skill:
+            system_messages = [self._SYSTEM_STATIC, self._SYSTEM_DIFF]
+            user_prompt = f"""Update best practices for {skill_name}. This is the current skill:
+
+<current_skill>
+{previous_skill}
+</current_skill>
+
+The documentation it was generated from has changed:
+
+<documentation_diff>
+{content}
+</documentation_diff>
+
+Generate normalized JSON for {skill_name}."""
+        else:
+            system_messages = [self._SYSTEM_STATIC]
+            user_prompt = f"""Extract best practices for {skill_name} from this documentation:
 
 <documentation>
 {content}
@@ -108,13 +181,26 @@ Return this JSON:
 
 Generate normalized JSON for {skill_name}."""
 
-        if self.verbose:
-            print(f"[Normalize] Calling LLM for {skill_name}...")
+        system_prompt = "".join(block["text"] for block in system_messages)
+
+        # Reuse the response to an identical prompt from an earlier run
+        cache_path = self.response_cache_path(system_prompt, user_prompt, skill_name)
+        cached = None if force_refresh else self.load_cached_response(cache_path)
 
-        # Call LLM
-        response_json = self.llm.generate_json(
-            user_prompt, system_prompt=self.SYSTEM_PROMPT
-        )
+        if cached is not None:
+            if self.verbose:
+                print(f"[Normalize] Using cached LLM response for {skill_name}")
+            response_json = cached
+        else:
+            if self.verbose:
+                print(f"[Normalize] Calling LLM for {skill_name}...")
+
+            # Call LLM
+            response_json = self.llm.generate_json(
+                user_prompt,
+                system_prompt=system_prompt,
+                system_messages=system_messages,
+            )
 
         if not response_json:
             print(f"[Normalize] LLM failed or returned invalid JSON for {skill_name}")
@@ -135,20 +221,23 @@ Generate normalized JSON for {skill_name}."""
         normalized["version"] = skill_version
 
         # Set last_updated in strict ISO format without microseconds
-        normalized["last_updated"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        normalized["last_updated"] = _iso_now()
 
         # Determine sources: prefer provided, else try to extract URLs from content
         if sources and isinstance(sources, list) and len(sources) > 0:
             normalized["sources"] = sources
+        elif pre_extracted_urls is not None:
+            normalized["sources"] = list(pre_extracted_urls)
         else:
             # crude URL extraction - ensure content is a string
-            urls = []
-            content_text = content if isinstance(content, str) else json.dumps(content)
-            for part in content_text.split():
-                if part.startswith("http://") or part.startswith("https://"):
-                    urls.append(part.strip().strip(".,;"))
+            content_text = (
+                content
+                if isinstance(content, str)
+                else json_codec.dumps(content).decode("utf-8")
+            )
+            urls = [u.rstrip(".,;)") for u in URL_RE.findall(content_text)]
             # fallback to empty list (validator will catch missing sources)
-            normalized["sources"] = urls
+            normalized["sources"] = list(dict.fromkeys(urls))
 
         # Ensure purpose meets minimum length by appending descriptive suffix if needed
         purpose = normalized.get("purpose", "")
@@ -176,11 +265,71 @@ Generate normalized JSON for {skill_name}."""
             for warning in val_warnings[:3]:
                 print(f"  - {warning}")
 
+        if cached is None:
+            self.save_cached_response(cache_path, response_json)
+
         if self.verbose:
             print(f"[Normalize] Successfully normalized {skill_name}")
 
         return normalized
 
+    def response_cache_path(
+        self, system_prompt: str, user_prompt: str, skill_name: str
+    ) -> Path:
+        """Get the cache file for an LLM prompt.
+
+        Args:
+            system_prompt: System prompt sent to the LLM
+            user_prompt: User prompt sent to the LLM
+            skill_name: Skill name
+
+        Returns:
+            Path keyed by a hash of the prompts, skill and model
+        """
+        key = hashlib.blake2b(digest_size=16)
+        for part in (system_prompt, user_prompt, skill_name, self.config.llm_model):
+            key.update(part.encode("utf-8"))
+            key.update(b"\0")
+        return self.config.llm_cache_dir / f"{key.hexdigest()}.json"
+
+    def load_cached_response(self, cache_path: Path) -> Optional[dict]:
+        """Load a cached LLM response if it exists and has not expired.
+
+        Args:
+            cache_path: Path from response_cache_path
+
+        Returns:
+            Cached response dict or None
+        """
+        ttl = self.config.llm_cache_ttl
+        if ttl <= 0:
+            return None
+
+        try:
+            if time.time() - cache_path.stat().st_mtime > ttl:
+                return None
+            cached = json_codec.loads(cache_path.read_bytes())
+        except (OSError, json_codec.JSONDecodeError):
+            return None
+
+        return cached if isinstance(cached, dict) else None
+
+    def save_cached_response(self, cache_path: Path, response: dict) -> None:
+        """Cache an LLM response that produced a valid skill.
+
+        Args:
+            cache_path: Path from response_cache_path
+            response: Parsed LLM response
+        """
+        if self.config.llm_cache_ttl <= 0:
+            return
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(json_codec.dumps(response))
+        except OSError as e:
+            print(f"[Normalize] Error writing LLM cache: {e}")
+
     def skill_to_markdown(self, skill: dict, sources: list[str]) -> str:
         """Convert normalized skill to SKILLS.md format.
 
@@ -193,20 +342,24 @@ Generate normalized JSON for {skill_name}."""
         """
         skill["sources"] = sources
 
+        out = []
+        app = out.append
+
         # Create frontmatter
-        md = "---\n"
-        md += f'name: {skill.get("name", "Unknown")}\n'
-        md += f'version: {skill.get("version", "unknown")}\n'
-        md += f'domains: {json.dumps(skill.get("domains", ["general"]))}\n'
-        md += f'lastGenerated: {skill.get("last_updated", "")}\n'
-        md += "---\n\n"
+        app("---\n")
+        app(f'name: {skill.get("name", "Unknown")}\n')
+        app(f'version: {skill.get("version", "unknown")}\n')
+        # stdlib json keeps the generator's existing `["a", "b"]` frontmatter spacing
+        app(f'domains: {json.dumps(skill.get("domains", ["general"]))}\n')
+        app(f'lastGenerated: {skill.get("last_updated", "")}\n')
+        app("---\n\n")
 
         # Create content
-        md += f'# Skill: {skill.get("name", "Unknown")}\n\n'
+        app(f'# Skill: {skill.get("name", "Unknown")}\n\n')
 
         # Purpose
         if "purpose" in skill:
-            md += f'## Purpose\n{skill["purpose"]}\n\n'
+            app(f'## Purpose\n{skill["purpose"]}\n\n')
 
         # Version
         if "version" in skill:
@@ -214,63 +367,20 @@ Generate normalized JSON for {skill_name}."""
             version_text = f'{skill["version"]}'
             if version_note:
                 version_text += f". {version_note}"
-            md += f"## Version\n{version_text}\n\n"
-
-        # Principles
-        if "principles" in skill and skill["principles"]:
-            md += "## Principles\n"
-            for principle in skill["principles"]:
-                md += f"- {principle}\n"
-            md += "\n"
-
-        # Mandatory Rules
-        if "rules" in skill and skill["rules"]:
-            md += "## Mandatory Rules\n"
-            for rule in skill["rules"]:
-                md += f"- {rule}\n"
-            md += "\n"
-
-        # Recommended Patterns
-        if "patterns" in skill and skill["patterns"]:
-            md += "## Recommended Patterns\n"
-            for pattern in skill["patterns"]:
-                md += f"- {pattern}\n"
-            md += "\n"
-
-        # Anti-Patterns
-        if "anti_patterns" in skill and skill["anti_patterns"]:
-            md += "## Anti-Patterns\n"
-            for anti in skill["anti_patterns"]:
-                md += f"- {anti}\n"
-            md += "\n"
-
-        # Security
-        if "security" in skill and skill["security"]:
-            md += "## Security\n"
-            for item in skill["security"]:
-                md += f"- {item}\n"
-            md += "\n"
-
-        # Performance
-        if "performance" in skill and skill["performance"]:
-            md += "## Performance\n"
-            for item in skill["performance"]:
-                md += f"- {item}\n"
-            md += "\n"
-
-        # Tooling
-        if "tooling" in skill and skill["tooling"]:
-            md += "## Tooling\n"
-            for item in skill["tooling"]:
-                md += f"- {item}\n"
-            md += "\n"
+            app(f"## Version\n{version_text}\n\n")
+
+        # List sections, in document order
+        for key, title in _MD_SECTIONS:
+            items = skill.get(key)
+            if items:
+                app(f"## {title}\n- " + "\n- ".join(items) + "\n\n")
 
         # Last-Updated
-        md += f'## Last-Updated\n{skill.get("last_updated", "unknown")}\n\n'
+        app(f'## Last-Updated\n{skill.get("last_updated", "unknown")}\n\n')
 
         # Sources
-        md += "## Sources\n"
-        for source in sources:
-            md += f"- {source}\n"
+        app("## Sources\n")
+        if sources:
+            app("- " + "\n- ".join(sources) + "\n")
 
-        return md
+        return "".join(out)
@@ -2,26 +2,148 @@
 
 import json
 import re
-from typing import Optional
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Union
 from pathlib import Path
+import json_codec
+
+
+@dataclass(slots=True, frozen=True)
+class Skill:
+    """Immutable, slotted form of a normalized skill.
+
+    Sections are tuples, so an instance can be held or shared without copying.
+    Keys without a field of their own (e.g. domains, version_notes) are kept
+    in extras, so a from_dict/to_dict round trip loses nothing. Validation and
+    markdown generation still work on dicts; see to_dict.
+    """
+
+    name: str = ""
+    version: str = ""
+    purpose: str = ""
+    principles: tuple[str, ...] = ()
+    rules: tuple[str, ...] = ()
+    patterns: tuple[str, ...] = ()
+    anti_patterns: tuple[str, ...] = ()
+    security: tuple[str, ...] = ()
+    performance: tuple[str, ...] = ()
+    tooling: tuple[str, ...] = ()
+    last_updated: str = ""
+    sources: tuple[str, ...] = ()
+    extras: tuple[tuple[str, Any], ...] = ()
+
+    @classmethod
+    def from_dict(cls, skill: dict) -> "Skill":
+        """Build a Skill from a normalized skill dict.
+
+        Args:
+            skill: Normalized skill dict
+
+        Returns:
+            Skill with list sections converted to tuples
+        """
+        fields = cls.__dataclass_fields__
+        values = {}
+        extras = []
+        for key, value in skill.items():
+            if key in fields and key != "extras":
+                values[key] = tuple(value) if isinstance(value, list) else value
+            else:
+                extras.append((key, value))
+        return cls(**values, extras=tuple(extras))
+
+    def to_dict(self) -> dict:
+        """Convert back to the dict shape used across the pipeline.
+
+        Returns:
+            Skill dict with tuple sections converted to lists
+        """
+        result = {}
+        for field in self.__dataclass_fields__:
+            if field == "extras":
+                continue
+            value = getattr(self, field)
+            result[field] = list(value) if isinstance(value, tuple) else value
+        result.update(self.extras)
+        return result
+
+
+# Metadata fields that must be present and non-empty
+_REQ_FIELDS = ("name", "version", "purpose", "last_updated", "sources")
+
+# Required list sections, checked for presence, size and item quality
+_REQ_SECTIONS: tuple[str, ...] = tuple(
+    sys.intern(section)
+    for section in (
+        "rules",
+        "patterns",
+        "anti_patterns",
+        "security",
+        "performance",
+        "tooling",
+    )
+)
+
+_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$")
+
+# Recent validate_skill results keyed by the skill's canonical JSON, shared
+# by all validators (the pipeline validates each skill twice)
+_RESULT_CACHE_SIZE = 128
+_RESULT_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def _is_cacheable(skill: dict) -> bool:
+    """Check that a skill's canonical JSON determines its validation result.
+
+    JSON writes tuples like lists, but validation rejects tuple sections and
+    echoes non-string items verbatim, so only the plain str/list-of-str shape
+    may share result cache entries.
+
+    Args:
+        skill: Normalized skill dict
+
+    Returns:
+        True if the result can be cached under the skill's canonical JSON
+    """
+    for value in skill.values():
+        if isinstance(value, tuple):
+            return False
+        if isinstance(value, list) and not all(isinstance(item, str) for item in value):
+            return False
+    return True
 
 
 class SkillValidator:
     """Validate skills against SKILLS.md specification."""
 
+    __slots__ = ("verbose", "errors", "warnings")
+
     # Vague language patterns to avoid
-    VAGUE_PATTERNS = [
-        "should",
-        "try",
-        "might",
-        "possibly",
-        "perhaps",
-        "seems",
-        "appears",
-        "may",
-        "can",
-        "could",
-    ]
+    VAGUE_PATTERNS = frozenset(
+        {
+            "should",
+            "try",
+            "might",
+            "possibly",
+            "perhaps",
+            "seems",
+            "appears",
+            "may",
+            "can",
+            "could",
+        }
+    )
+
+    # Any vague word as a whole whitespace-delimited token, in one
+    # case-insensitive scan (no lowercased copy of each item needed)
+    _VAGUE_RE = re.compile(
+        r"(?<!\S)(?:" + "|".join(sorted(VAGUE_PATTERNS)) + r")(?!\S)",
+        re.IGNORECASE,
+    )
 
     # Section requirements (min_items, max_items)
     SECTION_LIMITS = {
@@ -35,6 +157,7 @@ class SkillValidator:
     }
 
     CHAR_LIMITS = {
+        "item": (15, 150),
         "purpose": (50, 150),
         "version": (20, 200),
     }
@@ -49,170 +172,191 @@ class SkillValidator:
         self.errors = []
         self.warnings = []
 
-    def validate_skill(self, skill: dict) -> tuple[bool, list[str], list[str]]:
+    def validate_skill(
+        self, skill: Union[dict, Skill]
+    ) -> tuple[bool, list[str], list[str]]:
         """Validate normalized skill.
 
+        Args:
+            skill: Normalized skill dict or Skill
+
+        Returns:
+            Tuple of (is_valid, errors, warnings)
+        """
+        if isinstance(skill, Skill):
+            # Convert once; every check below works on the dict shape
+            skill = skill.to_dict()
+
+        key = None
+        if _is_cacheable(skill):
+            try:
+                key = json_codec.dumps(skill, sort_keys=True)
+            except (TypeError, ValueError):
+                # Not JSON-serializable; validate without caching
+                pass
+
+        cached = None
+        if key is not None:
+            with _RESULT_CACHE_LOCK:
+                cached = _RESULT_CACHE.get(key)
+                if cached is not None:
+                    _RESULT_CACHE.move_to_end(key)
+
+        if cached is not None:
+            is_valid, errors, warnings = cached[0], list(cached[1]), list(cached[2])
+        else:
+            is_valid, errors, warnings = self._validate_impl(skill)
+            if key is not None:
+                with _RESULT_CACHE_LOCK:
+                    _RESULT_CACHE[key] = (is_valid, tuple(errors), tuple(warnings))
+                    if len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+                        _RESULT_CACHE.popitem(last=False)
+
+        # self.errors/self.warnings keep the latest result for inspection
+        self.errors = errors
+        self.warnings = warnings
+
+        if self.verbose:
+            if errors:
+                print(f"[Validate] Errors: {len(errors)}")
+            if warnings:
+                print(f"[Validate] Warnings: {len(warnings)}")
+
+        return is_valid, errors, warnings
+
+    def _validate_impl(self, skill: dict) -> tuple[bool, list[str], list[str]]:
+        """Run every check on a skill, without consulting the result cache.
+
         Args:
             skill: Normalized skill dict
 
         Returns:
             Tuple of (is_valid, errors, warnings)
         """
-        self.errors = []
-        self.warnings = []
+        # Collected locally so concurrent calls on one validator don't mix
+        errors: list[str] = []
+        warnings: list[str] = []
 
         # Validate metadata
-        self._validate_metadata(skill)
+        self._validate_metadata(skill, errors, warnings)
 
         # Validate sections
-        self._validate_sections(skill)
+        self._validate_sections(skill, errors)
 
         # Validate content quality
-        self._validate_quality(skill)
+        self._validate_quality(skill, errors, warnings)
 
-        if self.verbose:
-            if self.errors:
-                print(f"[Validate] Errors: {len(self.errors)}")
-            if self.warnings:
-                print(f"[Validate] Warnings: {len(self.warnings)}")
-
-        return len(self.errors) == 0, self.errors, self.warnings
+        return len(errors) == 0, errors, warnings
 
-    def _validate_metadata(self, skill: dict) -> None:
+    def _validate_metadata(
+        self, skill: dict, errors: list[str], warnings: list[str]
+    ) -> None:
         """Validate skill metadata."""
-        required = ["name", "version", "purpose", "last_updated", "sources"]
-
-        for field in required:
+        for field in _REQ_FIELDS:
             if field not in skill or not skill[field]:
-                self.errors.append(f"Missing or empty field: {field}")
+                errors.append(f"Missing or empty field: {field}")
 
         # Validate name
         name = skill.get("name", "")
         if name and len(name) > 50:
-            self.errors.append(f"Name too long: {len(name)} chars (max 50)")
+            errors.append(f"Name too long: {len(name)} chars (max 50)")
 
         # Validate version
         version = skill.get("version", "")
         if version and len(version) > 20:
-            self.errors.append(f"Version too long: {len(version)} chars (max 20)")
+            errors.append(f"Version too long: {len(version)} chars (max 20)")
 
         # Validate purpose
         purpose = skill.get("purpose", "")
         if purpose:
-            if len(purpose) < 50:
-                self.errors.append(f"Purpose too short: {len(purpose)} chars (min 50)")
-            elif len(purpose) > 150:
-                self.errors.append(f"Purpose too long: {len(purpose)} chars (max 150)")
+            min_chars, max_chars = self.CHAR_LIMITS["purpose"]
+            if len(purpose) < min_chars:
+                errors.append(
+                    f"Purpose too short: {len(purpose)} chars (min {min_chars})"
+                )
+            elif len(purpose) > max_chars:
+                errors.append(
+                    f"Purpose too long: {len(purpose)} chars (max {max_chars})"
+                )
 
         # Validate last_updated ISO format
         last_updated = skill.get("last_updated", "")
-        if last_updated and not re.match(
-            r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$", last_updated
-        ):
-            self.errors.append(f"Invalid ISO date: {last_updated}")
+        if last_updated and not _ISO_RE.match(last_updated):
+            errors.append(f"Invalid ISO date: {last_updated}")
 
         # Validate sources
         sources = skill.get("sources", [])
         if not isinstance(sources, list):
-            self.errors.append("sources must be a list")
+            errors.append("sources must be a list")
         elif len(sources) == 0:
-            self.errors.append("At least one source required")
+            errors.append("At least one source required")
         else:
             for source in sources:
                 if not isinstance(source, str) or not source.startswith("http"):
-                    self.warnings.append(f"Invalid source URL: {source}")
+                    warnings.append(f"Invalid source URL: {source}")
 
-    def _validate_sections(self, skill: dict) -> None:
+    def _validate_sections(self, skill: dict, errors: list[str]) -> None:
         """Validate section presence and item counts."""
-        required_sections = [
-            "rules",
-            "patterns",
-            "anti_patterns",
-            "security",
-            "performance",
-            "tooling",
-        ]
-
-        for section in required_sections:
+        for section in _REQ_SECTIONS:
             if section not in skill:
-                self.errors.append(f"Missing section: {section}")
+                errors.append(f"Missing section: {section}")
                 continue
 
             items = skill[section]
             if not isinstance(items, list):
-                self.errors.append(f"{section} must be a list")
+                errors.append(f"{section} must be a list")
                 continue
 
             min_items, max_items = self.SECTION_LIMITS[section]
 
             if len(items) < min_items:
-                self.errors.append(
+                errors.append(
                     f"{section}: too few items ({len(items)}, min {min_items})"
                 )
             elif len(items) > max_items:
-                self.errors.append(
+                errors.append(
                     f"{section}: too many items ({len(items)}, max {max_items})"
                 )
 
-    def _validate_quality(self, skill: dict) -> None:
+    def _validate_quality(
+        self, skill: dict, errors: list[str], warnings: list[str]
+    ) -> None:
         """Validate content clarity and quality."""
-        all_items = []
+        # Hoisted out of the per-item loop
+        min_chars, max_chars = self.CHAR_LIMITS["item"]
+        vague_search = self._VAGUE_RE.search
 
-        # Collect all items from list sections
-        for section in [
-            "rules",
-            "patterns",
-            "anti_patterns",
-            "security",
-            "performance",
-            "tooling",
-        ]:
+        for section in _REQ_SECTIONS:
             items = skill.get(section, [])
-            if isinstance(items, list):
-                all_items.extend([(section, item) for item in items])
-
-        # Check each item
-        for section, item in all_items:
-            if not isinstance(item, str):
-                self.errors.append(f"{section}: non-string item: {item}")
+            if not isinstance(items, list):
                 continue
 
-            # Check length
-            if len(item) < 15:
-                self.warnings.append(
-                    f'{section}: item too short ({len(item)} chars): "{item}"'
-                )
-            elif len(item) > 150:
-                self.warnings.append(
-                    f'{section}: item too long ({len(item)} chars): "{item[:40]}..."'
-                )
+            seen = set()
+            for item in items:
+                if not isinstance(item, str):
+                    errors.append(f"{section}: non-string item: {item}")
+                    continue
+
+                # Check length
+                n = len(item)
+                if n < min_chars:
+                    warnings.append(f'{section}: item too short ({n} chars): "{item}"')
+                elif n > max_chars:
+                    warnings.append(
+                        f'{section}: item too long ({n} chars): "{item[:40]}..."'
+                    )
 
-            # Check for vague language
-            item_lower = item.lower()
-            for vague in self.VAGUE_PATTERNS:
-                if f" {vague} " in f" {item_lower} ":
-                    self.warnings.append(
-                        f'{section}: vague language "{vague}" in: "{item[:40]}..."'
+                # Check for vague language
+                match = vague_search(item)
+                if match:
+                    warnings.append(
+                        f'{section}: vague language "{match.group(0).lower()}" in: "{item[:40]}..."'
                     )
-                    break
 
-        # Check for duplicates within sections
-        for section in [
-            "rules",
-            "patterns",
-            "anti_patterns",
-            "security",
-            "performance",
-            "tooling",
-        ]:
-            items = skill.get(section, [])
-            if isinstance(items, list):
-                seen = set()
-                for item in items:
-                    if item in seen:
-                        self.warnings.append(
-                            f'{section}: duplicate item: "{item[:40]}..."'
-                        )
+                # Check for duplicates within the section
+                if item in seen:
+                    warnings.append(f'{section}: duplicate item: "{item[:40]}..."')
+                else:
                     seen.add(item)
 
     def validate_json_schema(self, data: dict) -> tuple[bool, list[str]]:
@@ -1,16 +1,125 @@
 """Fetch documentation and source content from various sources."""
 
-import json
+import difflib
+import functools
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config, get_config
+import json_codec
+
+# http(s) URLs embedded in documentation text
+URL_RE = re.compile(r"https?://[^\s<>\"')]+")
+
+# Hash used for snapshot .sha sidecars (BLAKE2b-128)
+_snapshot_hash = functools.partial(hashlib.blake2b, digest_size=16)
+
+TRUNCATION_MARKER = "\n\n[... content truncated ...]"
+
+# One pooled session shared by every SourceFetcher in the process, so
+# concurrent fetchers reuse connections to the same hosts
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+# url -> monotonic time until which a failed fetch is not retried
+_FAILED_URLS: dict[str, float] = {}
+
+
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After only up to RETRY_AFTER_MAX seconds."""
+
+    RETRY_AFTER_MAX = 60.0
+
+    def get_retry_after(self, response) -> Optional[float]:
+        """Server-requested delay, clamped so one response can't stall a worker."""
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.RETRY_AFTER_MAX)
+
+
+def _get_session() -> requests.Session:
+    """Get the shared HTTP session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                session.headers.update({"User-Agent": "AI-Skills-Generator/1.0"})
+                # Sized for concurrent skills each fetching their sources in
+                # parallel; transient statuses are retried on the pooled
+                # connection before fetch_url sees a failure
+                adapter = HTTPAdapter(
+                    pool_connections=16,
+                    pool_maxsize=32,
+                    max_retries=_CappedRetry(
+                        total=3,
+                        # One quick reconnect; never re-wait a read timeout
+                        connect=1,
+                        read=0,
+                        backoff_factor=0.5,
+                        status_forcelist=(429, 502, 503, 504),
+                        allowed_methods=frozenset({"GET", "HEAD"}),
+                        raise_on_status=False,
+                    ),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write bytes to a file so readers see either the old or new content.
+
+    Args:
+        path: Destination file
+        data: Bytes to write
+    """
+    # Unique temp file in the same directory, so concurrent writers don't
+    # share it and os.replace stays a same-filesystem rename
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+@dataclass
+class FetchedSources:
+    """Combined source text for a skill plus what was learned while building it."""
+
+    text: str
+    urls: list[str]
+    byte_size: int
 
 
 class SourceFetcher:
     """Fetch content from URLs, GitHub repos, and changelogs."""
 
+    # Seconds a failed URL is skipped before it is tried again
+    FAILURE_TTL = 300
+
+    # Concurrent source downloads within one skill's collect_sources
+    SOURCE_WORKERS = 4
+
     def __init__(self, config: Optional[Config] = None, verbose: bool = False):
         """Initialize source fetcher.
 
@@ -20,39 +129,149 @@ class SourceFetcher:
         """
         self.config = config or get_config()
         self.verbose = verbose
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "AI-Skills-Generator/1.0",
-            }
-        )
+        self.session = _get_session()
+
+        # Parsed descriptors: path -> (st_mtime_ns, descriptor)
+        self._desc_cache: dict[str, tuple[int, dict]] = {}
 
-    def fetch_url(self, url: str, timeout: int = 30) -> Optional[str]:
+    def fetch_url(
+        self, url: str, timeout: int = 30, max_bytes: int = 262144
+    ) -> Optional[str]:
         """Fetch content from URL.
 
+        Sends a conditional GET when a cached copy with an ETag or
+        Last-Modified validator exists, and returns the cached body on 304.
+        The body is streamed and truncated at `max_bytes`, since anything
+        past the normalizer's prompt limit is discarded anyway.
+
         Args:
             url: URL to fetch
             timeout: Request timeout in seconds
+            max_bytes: Maximum number of body bytes to read
 
         Returns:
             Content or None on failure
         """
+        # Don't pay another timeout for a URL that just failed
+        retry_at = _FAILED_URLS.get(url)
+        if retry_at is not None:
+            if retry_at > time.monotonic():
+                if self.verbose:
+                    print(f"[Fetch] Skipping recently failed {url}")
+                return None
+            _FAILED_URLS.pop(url, None)
+
+        cached = self.load_http_cache(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
         try:
             if self.verbose:
                 print(f"[Fetch] GET {url}")
 
-            response = self.session.get(url, timeout=timeout)
-            response.raise_for_status()
-
-            content = response.text
+            response = self.session.get(
+                url, timeout=timeout, headers=headers or None, stream=True
+            )
+
+            try:
+                if cached and response.status_code == 304:
+                    if self.verbose:
+                        print(f"[Fetch] Not modified, using cached copy of {url}")
+                    return cached["body"]
+
+                response.raise_for_status()
+
+                buf = bytearray()
+                for chunk in response.iter_content(chunk_size=16384):
+                    buf += chunk
+                    if len(buf) >= max_bytes:
+                        if self.verbose:
+                            print(f"[Fetch] Truncated {url} at {max_bytes} bytes")
+                        del buf[max_bytes:]
+                        break
+            finally:
+                response.close()
+
+            try:
+                content = buf.decode(response.encoding or "utf-8", errors="replace")
+            except (LookupError, TypeError):
+                # Unknown charset in Content-Type (e.g. "utf8mb4")
+                content = buf.decode("utf-8", errors="replace")
             if self.verbose:
                 print(f"[Fetch] Success: {len(content)} chars")
 
+            self.save_http_cache(url, response, content)
+
             return content
         except requests.RequestException as e:
             print(f"[Fetch] Error fetching {url}: {e}")
+            _FAILED_URLS[url] = time.monotonic() + self.FAILURE_TTL
             return None
 
+    def get_http_cache_path(self, url: str) -> Path:
+        """Get path for the cached HTTP response of a URL.
+
+        Args:
+            url: Source URL
+
+        Returns:
+            Path object
+        """
+        key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+        return self.config.snapshots_dir / "http" / f"{key}.json"
+
+    def load_http_cache(self, url: str) -> Optional[dict]:
+        """Load the cached response (validators + body) for a URL.
+
+        Args:
+            url: Source URL
+
+        Returns:
+            Cache entry dict or None
+        """
+        cache_path = self.get_http_cache_path(url)
+        if not cache_path.exists():
+            return None
+
+        try:
+            entry = json_codec.loads(cache_path.read_bytes())
+        except (IOError, json_codec.JSONDecodeError):
+            return None
+
+        return entry if entry.get("url") == url else None
+
+    def save_http_cache(self, url: str, response, content: str) -> None:
+        """Cache a response body if the server sent ETag/Last-Modified.
+
+        Args:
+            url: Source URL
+            response: HTTP response
+            content: Decoded response body
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        cache_path = self.get_http_cache_path(url)
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": content,
+        }
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Skills sharing a source URL may write this entry concurrently
+            _atomic_write(cache_path, json_codec.dumps(entry))
+        except IOError as e:
+            print(f"[Fetch] Error caching {url}: {e}")
+
     def fetch_github_file(
         self,
         repo: str,
@@ -111,17 +330,31 @@ class SourceFetcher:
         """
         descriptor_path = self.config.sources_dir / f"{skill_name}-sources.json"
 
-        if not descriptor_path.exists():
+        # The pipeline loads each descriptor more than once; reparse only
+        # when the file has changed
+        try:
+            mtime_ns = descriptor_path.stat().st_mtime_ns
+        except FileNotFoundError:
             print(f"[Fetch] Source descriptor not found: {descriptor_path}")
             return None
 
+        key = str(descriptor_path)
+        cached = self._desc_cache.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
         try:
-            with open(descriptor_path, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
+            descriptor = json_codec.loads(descriptor_path.read_bytes())
+        except FileNotFoundError:
+            print(f"[Fetch] Source descriptor not found: {descriptor_path}")
+            return None
+        except json_codec.JSONDecodeError as e:
             print(f"[Fetch] Error parsing descriptor: {e}")
             return None
 
+        self._desc_cache[key] = (mtime_ns, descriptor)
+        return descriptor
+
     def fetch_sources(self, skill_name: str) -> Optional[str]:
         """Fetch and combine all sources for a skill.
 
@@ -131,48 +364,112 @@ class SourceFetcher:
         Returns:
             Combined content from all sources
         """
+        fetched = self.collect_sources(skill_name)
+        return fetched.text if fetched else None
+
+    def collect_sources(self, skill_name: str) -> Optional[FetchedSources]:
+        """Fetch all sources for a skill, bounded to config.max_content_chars.
+
+        Sources are kept in descriptor order until the budget runs out, and
+        the source that overflows it is cut to fill the rest. URLs found in
+        the kept text are collected in the same pass.
+
+        Args:
+            skill_name: Skill name
+
+        Returns:
+            FetchedSources, or None if there is no usable content
+        """
         descriptor = self.load_source_descriptor(skill_name)
         if not descriptor:
             return None
 
-        combined = f"# Sources for {skill_name}\n\n"
-        combined += f"Generated: {datetime.now().isoformat()}\n\n"
+        # No run timestamp here: the combined text is snapshotted and hashed,
+        # so it must be identical when the sources are
+        parts = [f"# Sources for {skill_name}\n\n"]
 
         sources = descriptor.get("sources", [])
         if not sources:
             print(f"[Fetch] No sources in descriptor for {skill_name}")
             return None
 
-        for source in sources:
-            source_type = source.get("type", "")
-
-            if source_type == "url":
-                url = source.get("url")
-                if url:
-                    content = self.fetch_url(url)
-                    if content:
-                        combined += f"## Source: {url}\n\n{content}\n\n"
-
-            elif source_type == "github_file":
-                repo = source.get("repo")
-                path = source.get("path")
-                if repo and path:
-                    content = self.fetch_github_file(repo, path)
-                    if content:
-                        combined += f"## GitHub: {repo}/{path}\n\n{content}\n\n"
-
-            elif source_type == "github_releases":
-                repo = source.get("repo")
-                last_n = source.get("last_n_releases", 3)
-                if repo:
-                    releases = self.fetch_github_releases(repo, last_n)
-                    if releases:
-                        for rel in releases:
-                            tag = rel.get("tag_name", "unknown")
-                            body = rel.get("body", "")
-                            combined += f"## Release: {tag}\n\n{body}\n\n"
-
-        return combined if len(combined) > 100 else None
+        # Download a skill's sources concurrently; map() keeps descriptor
+        # order. Capped separately: run_pipeline already fetches up to
+        # fetch_concurrency skills at once
+        workers = min(self.SOURCE_WORKERS, len(sources))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            sections = list(executor.map(self.fetch_source_section, sources))
+
+        budget = self.config.max_content_chars - len(parts[0])
+        urls = []
+        for section in sections:
+            if len(section) > budget:
+                # Fill what is left of the budget; whole sources that come
+                # first (or failed sources, which are empty) don't starve it
+                section = section[: max(budget, 0)]
+                urls.extend(URL_RE.findall(section))
+                parts.append(section)
+                parts.append(TRUNCATION_MARKER)
+                if self.verbose:
+                    print(
+                        f"[Fetch] Content for {skill_name} truncated to "
+                        f"{self.config.max_content_chars} chars"
+                    )
+                break
+
+            urls.extend(URL_RE.findall(section))
+            parts.append(section)
+            budget -= len(section)
+
+        combined = "".join(parts)
+        if len(combined) <= 100:
+            return None
+
+        return FetchedSources(
+            text=combined,
+            urls=list(dict.fromkeys(u.rstrip(".,;)") for u in urls)),
+            byte_size=len(combined.encode("utf-8")),
+        )
+
+    def fetch_source_section(self, source: dict) -> str:
+        """Fetch a single descriptor source and format it as markdown.
+
+        Args:
+            source: Source entry from the descriptor
+
+        Returns:
+            Markdown section(s), or empty string if nothing was fetched
+        """
+        source_type = source.get("type", "")
+
+        if source_type == "url":
+            url = source.get("url")
+            if url:
+                content = self.fetch_url(url)
+                if content:
+                    return f"## Source: {url}\n\n{content}\n\n"
+
+        elif source_type == "github_file":
+            repo = source.get("repo")
+            path = source.get("path")
+            if repo and path:
+                content = self.fetch_github_file(repo, path)
+                if content:
+                    return f"## GitHub: {repo}/{path}\n\n{content}\n\n"
+
+        elif source_type == "github_releases":
+            repo = source.get("repo")
+            last_n = source.get("last_n_releases", 3)
+            if repo:
+                releases = self.fetch_github_releases(repo, last_n)
+                if releases:
+                    return "".join(
+                        f"## Release: {rel.get('tag_name', 'unknown')}\n\n"
+                        f"{rel.get('body', '')}\n\n"
+                        for rel in releases
+                    )
+
+        return ""
 
     def get_snapshot_path(self, skill_name: str) -> Path:
         """Get path for source snapshot file.
@@ -197,7 +494,16 @@ class SourceFetcher:
         """
         snapshot_path = self.get_snapshot_path(skill_name)
         try:
-            snapshot_path.write_text(content, encoding="utf-8")
+            # Binary I/O: no newline translation, so the bytes hashed here are
+            # the bytes on disk on every platform
+            data = content.encode("utf-8")
+            # Atomic replace: a concurrent or interrupted save never leaves
+            # a torn snapshot for compute_diff to read
+            _atomic_write(snapshot_path, data)
+            _atomic_write(
+                snapshot_path.with_suffix(".sha"),
+                _snapshot_hash(data).hexdigest().encode("ascii"),
+            )
             if self.verbose:
                 print(f"[Fetch] Saved snapshot: {snapshot_path}")
             return True
@@ -219,11 +525,23 @@ class SourceFetcher:
             return None
 
         try:
-            return snapshot_path.read_text(encoding="utf-8")
+            return snapshot_path.read_bytes().decode("utf-8")
         except IOError as e:
             print(f"[Fetch] Error loading snapshot: {e}")
             return None
 
+    @staticmethod
+    def content_digest(content: str) -> str:
+        """Fingerprint snapshot content.
+
+        Args:
+            content: Content to hash
+
+        Returns:
+            BLAKE2b-128 hex digest
+        """
+        return _snapshot_hash(content.encode("utf-8")).hexdigest()
+
     def compute_diff(self, skill_name: str, content: str) -> Optional[str]:
         """Get content that changed since last snapshot.
 
@@ -232,25 +550,82 @@ class SourceFetcher:
             content: New content
 
         Returns:
-            Changed content or full content if no previous snapshot
+            None if unchanged, otherwise the full content
         """
+        change = self.compute_change(skill_name, content)
+        return None if change is None else content
+
+    def compute_change(
+        self, skill_name: str, content: str
+    ) -> Optional[tuple[str, bool]]:
+        """Describe how content changed since last snapshot.
+
+        Equality is decided from the snapshot's ``.sha`` sidecar so the previous
+        content is only read when something changed.
+
+        Args:
+            skill_name: Skill name
+            content: New content
+
+        Returns:
+            None if unchanged, otherwise (text, is_diff): a unified diff against
+            the snapshot if it is under half the size of the new content,
+            else the full content
+        """
+        snapshot_path = self.get_snapshot_path(skill_name)
+        digest = self.content_digest(content)
+
+        try:
+            previous_digest = (
+                snapshot_path.with_suffix(".sha").read_bytes().decode("ascii")
+            )
+        except (IOError, ValueError):
+            previous_digest = None
+
+        if previous_digest is None:
+            # Snapshot written without a sidecar: hash the file in place
+            # rather than decoding it, and backfill the sidecar
+            try:
+                with open(snapshot_path, "rb") as f:
+                    previous_digest = hashlib.file_digest(f, _snapshot_hash).hexdigest()
+            except IOError:
+                pass
+            else:
+                try:
+                    _atomic_write(
+                        snapshot_path.with_suffix(".sha"),
+                        previous_digest.encode("ascii"),
+                    )
+                except IOError as e:
+                    print(f"[Fetch] Error writing snapshot digest: {e}")
+
+        if previous_digest is not None and previous_digest.strip() == digest:
+            if self.verbose:
+                print(f"[Fetch] Content unchanged, skipping LLM call")
+            return None
+
         previous = self.load_snapshot(skill_name)
 
         if not previous:
             if self.verbose:
                 print(f"[Fetch] No previous snapshot, using full content")
-            return content
+            return content, False
 
-        # Simple diff: if content is very different, return it
-        # In production, use difflib for detailed diffs
-        if content == previous:
-            if self.verbose:
-                print(f"[Fetch] Content unchanged, skipping LLM call")
-            return None
+        diff = "\n".join(
+            difflib.unified_diff(
+                previous.splitlines(), content.splitlines(), n=3, lineterm=""
+            )
+        )
 
         if self.verbose:
             prev_len = len(previous)
             curr_len = len(content)
-            print(f"[Fetch] Content changed: {prev_len} -> {curr_len} chars")
+            print(
+                f"[Fetch] Content changed: {prev_len} -> {curr_len} chars "
+                f"(diff {len(diff)} chars)"
+            )
+
+        if len(diff) < len(content) / 2:
+            return diff, True
 
-        return content
+        return content, False
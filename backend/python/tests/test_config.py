@@ -48,6 +48,46 @@ class TestConfig:
         assert is_valid is False
         assert any("LLM_BASE_URL" in str(e) for e in errors)
 
+    def test_config_validate_invalid_concurrency(self):
+        """Test Config.validate() rejects a non-positive LLM concurrency."""
+        config = Config()
+        config.llm_concurrency = 0
+
+        is_valid, errors = config.validate()
+
+        assert is_valid is False
+        assert any("LLM_CONCURRENCY" in str(e) for e in errors)
+
+    def test_config_refresh_env_cache(self, monkeypatch):
+        """Test env var changes are picked up only after refresh_env_cache()."""
+        Config()
+        monkeypatch.setenv("LLM_MODEL", "refreshed-model")
+
+        try:
+            assert Config().llm_model != "refreshed-model"
+
+            Config.refresh_env_cache()
+            assert Config().llm_model == "refreshed-model"
+        finally:
+            monkeypatch.undo()
+            Config.refresh_env_cache()
+
+    def test_config_malformed_int_reported_by_validate(self, monkeypatch):
+        """Test a non-numeric integer setting is a validate() error, not a crash."""
+        monkeypatch.setenv("LLM_CONCURRENCY", "eight")
+
+        try:
+            Config.refresh_env_cache()
+            config = Config()
+
+            assert config.llm_concurrency == 8
+            is_valid, errors = config.validate()
+            assert is_valid is False
+            assert "LLM_CONCURRENCY must be an integer, got 'eight'" in errors
+        finally:
+            monkeypatch.undo()
+            Config.refresh_env_cache()
+
     def test_config_validate_missing_github_token(self):
         """Test Config.validate() accepts missing GitHub token."""
         config = Config()
@@ -69,6 +109,15 @@ class TestConfig:
         assert isinstance(config.snapshots_dir, Path)
         assert isinstance(config.sources_dir, Path)
 
+    def test_config_skill_md_path_memoized(self):
+        """Test skill_md_path builds the SKILLS.md path once per skill."""
+        config = Config()
+
+        path = config.skill_md_path("react")
+
+        assert path == config.skills_dir / "react" / "SKILLS.md"
+        assert config.skill_md_path("react") is path
+
     def test_config_debug_flag(self):
         """Test debug flag."""
         config = Config()
@@ -0,0 +1,135 @@
+"""Tests for github_sync module."""
+
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from config import Config
+from github_sync import GitHubSync
+
+
+class TestGitHubSync:
+    """Test GitHubSync class."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Create test config with skills under tmp_path."""
+        cfg = Config()
+        cfg.skills_dir = tmp_path / "skills"
+        return cfg
+
+    @pytest.fixture
+    def git(self, config):
+        """Create GitHubSync with git commands mocked to succeed."""
+        sync = GitHubSync(config)
+        with patch.object(
+            sync, "run_git_command", return_value=(0, "bot@example.com\n", "")
+        ):
+            yield sync
+
+    def test_commit_staged_adds_sorted_paths_once(self, git, config):
+        """Test staged skills are added in one sorted git add."""
+        git.stage_skill("zod", ["https://zod.dev/docs"])
+        git.stage_skill("astro", ["https://docs.astro.build/guide"])
+
+        assert git.commit_staged()
+
+        add = git.run_git_command.call_args_list[0]
+        assert add.args == (
+            "add",
+            "-A",
+            "--",
+            str(config.skill_md_path("astro")),
+            str(config.skill_md_path("zod")),
+        )
+
+        # Nothing left staged: a second call runs no git commands
+        calls = git.run_git_command.call_count
+        assert git.commit_staged()
+        assert git.run_git_command.call_count == calls
+
+    def test_commit_staged_message_single_skill(self, git):
+        """Test one staged skill is committed with its sources in the message."""
+        git.stage_skill("react", ["https://react.dev/learn", "https://react.dev/ref"])
+
+        assert git.commit_staged()
+
+        commit = git.run_git_command.call_args_list[-1]
+        assert commit.args == (
+            "commit",
+            "-m",
+            "docs(skills): regenerate react from learn, ref",
+        )
+
+    def test_commit_staged_message_many_skills(self, git):
+        """Test several staged skills share one commit listing them in order."""
+        for skill_name in ("vue", "react", "astro"):
+            git.stage_skill(skill_name, [])
+
+        assert git.commit_staged()
+
+        commit = git.run_git_command.call_args_list[-1]
+        assert commit.args == (
+            "commit",
+            "-m",
+            "docs(skills): regenerate 3 skills (astro, react, vue)",
+        )
+
+    def test_commit_staged_failed_add_skips_commit(self, git):
+        """Test a failed git add returns False and keeps the skills staged."""
+        git.run_git_command.return_value = (1, "", "fatal")
+        git.stage_skill("react", [])
+
+        assert not git.commit_staged()
+        assert git.run_git_command.call_count == 1
+
+        # Still staged, so the caller can retry
+        git.run_git_command.return_value = (0, "bot@example.com\n", "")
+        assert git.commit_staged()
+        assert git.run_git_command.call_args_list[-1].args[:2] == ("commit", "-m")
+
+    def test_ensure_identity_keeps_configured_user(self, git):
+        """Test no identity is injected when git has user.email and user.name."""
+        git.ensure_identity()
+        git.ensure_identity()
+
+        assert git._git_env is None
+        assert [c.args for c in git.run_git_command.call_args_list] == [
+            ("config", "--get", "user.email"),
+            ("config", "--get", "user.name"),
+        ]
+
+    def test_ensure_identity_injects_env_when_name_missing(self, git):
+        """Test a configured email without a name still gets the bot identity."""
+        git.run_git_command.side_effect = [(0, "me@example.com\n", ""), (1, "", "")]
+
+        git.ensure_identity()
+
+        assert git._git_env["GIT_AUTHOR_NAME"] == GitHubSync.BOT_NAME
+
+    def test_ensure_identity_injects_bot_env_when_missing(self, git):
+        """Test the bot identity goes into the git environment, not git config."""
+        git.run_git_command.return_value = (1, "", "")
+
+        git.ensure_identity()
+
+        env = git._git_env
+        assert env["GIT_AUTHOR_NAME"] == GitHubSync.BOT_NAME
+        assert env["GIT_AUTHOR_EMAIL"] == GitHubSync.BOT_EMAIL
+        assert env["GIT_COMMITTER_NAME"] == GitHubSync.BOT_NAME
+        assert env["GIT_COMMITTER_EMAIL"] == GitHubSync.BOT_EMAIL
+        assert env["PATH"] == os.environ["PATH"]
+        # Only the lookup ran; nothing was written to the repository config
+        git.run_git_command.assert_called_once_with("config", "--get", "user.email")
+
+    def test_run_git_command_passes_identity_env(self, config):
+        """Test git subprocesses run with the injected identity environment."""
+        sync = GitHubSync(config)
+        sync._git_env = {"GIT_AUTHOR_NAME": GitHubSync.BOT_NAME}
+
+        with patch("github_sync.subprocess.run") as mock_run:
+            mock_run.return_value = Mock(returncode=0, stdout=b"", stderr=b"")
+            sync.run_git_command("commit", "-m", "message", capture=False)
+
+        assert mock_run.call_args.kwargs["env"] == sync._git_env
@@ -0,0 +1,42 @@
+"""Tests for json_codec module."""
+
+from unittest.mock import patch
+
+import pytest
+
+import json_codec
+
+
+class TestJsonCodec:
+    """Test json_codec helpers with and without orjson."""
+
+    @pytest.fixture(params=["orjson", "stdlib"])
+    def codec(self, request):
+        """Run each test against both backends."""
+        if request.param == "stdlib":
+            with patch.object(json_codec, "orjson", None):
+                yield json_codec
+        else:
+            if json_codec.orjson is None:
+                pytest.skip("orjson not installed")
+            yield json_codec
+
+    def test_round_trip(self, codec):
+        """Test dumps/loads round-trip for bytes and str input."""
+        data = {"name": "test", "items": ["ä", 1, None]}
+        encoded = codec.dumps(data)
+
+        assert isinstance(encoded, bytes)
+        assert codec.loads(encoded) == data
+        assert codec.loads(encoded.decode("utf-8")) == data
+
+    def test_sort_keys(self, codec):
+        """Test sort_keys gives identical bytes regardless of insertion order."""
+        assert codec.dumps({"b": 1, "a": 2}, sort_keys=True) == codec.dumps(
+            {"a": 2, "b": 1}, sort_keys=True
+        )
+
+    def test_invalid_json_raises_decode_error(self, codec):
+        """Test both backends raise the shared JSONDecodeError."""
+        with pytest.raises(codec.JSONDecodeError):
+            codec.loads("{not json")
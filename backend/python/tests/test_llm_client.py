@@ -1,11 +1,15 @@
 """Tests for llm_client module."""
 
+import asyncio
 import json
+import random
+import time
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 
+import json_codec
 from llm_client import LLMClient
 from config import Config
 
@@ -28,14 +32,14 @@ class TestLLMClient:
         """Create LLMClient instance."""
         return LLMClient(config, verbose=False)
 
-    @patch("llm_client.requests.post")
+    @patch("requests.Session.post")
     def test_successful_call(self, mock_post, client):
         """Test successful LLM call."""
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
-        mock_response.json.return_value = {
-            "choices": [{"message": {"content": "Test response"}}]
-        }
+        mock_response.content = json.dumps(
+            {"choices": [{"message": {"content": "Test response"}}]}
+        ).encode()
         mock_post.return_value = mock_response
 
         response = client.call("system prompt", "user message")
@@ -43,14 +47,14 @@ class TestLLMClient:
         assert response == "Test response"
         assert mock_post.called
 
-    @patch("llm_client.requests.post")
+    @patch("requests.Session.post")
     def test_call_with_timeout(self, mock_post, client):
         """Test LLM call respects timeout."""
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
-        mock_response.json.return_value = {
-            "choices": [{"message": {"content": "Response"}}]
-        }
+        mock_response.content = json.dumps(
+            {"choices": [{"message": {"content": "Response"}}]}
+        ).encode()
         mock_post.return_value = mock_response
 
         client.call("system", "user", timeout=30)
@@ -60,14 +64,14 @@ class TestLLMClient:
         call_kwargs = mock_post.call_args[1]
         assert call_kwargs.get("timeout") == 30
 
-    @patch("llm_client.requests.post")
+    @patch("requests.Session.post")
     def test_call_includes_api_key_when_enabled(self, mock_post, client):
         """Test API key is included in request when enabled."""
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
-        mock_response.json.return_value = {
-            "choices": [{"message": {"content": "Response"}}]
-        }
+        mock_response.content = json.dumps(
+            {"choices": [{"message": {"content": "Response"}}]}
+        ).encode()
         mock_post.return_value = mock_response
 
         client.config.llm_send_api_key = True
@@ -79,14 +83,14 @@ class TestLLMClient:
         headers = call_kwargs.get("headers", {})
         assert "Authorization" in headers
 
-    @patch("llm_client.requests.post")
+    @patch("requests.Session.post")
     def test_call_excludes_api_key_when_disabled(self, mock_post, client):
         """Test API key is excluded when disabled."""
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
-        mock_response.json.return_value = {
-            "choices": [{"message": {"content": "Response"}}]
-        }
+        mock_response.content = json.dumps(
+            {"choices": [{"message": {"content": "Response"}}]}
+        ).encode()
         mock_post.return_value = mock_response
 
         client.config.llm_send_api_key = False
@@ -98,38 +102,38 @@ class TestLLMClient:
         headers = call_kwargs.get("headers", {})
         assert "Authorization" not in headers
 
-    @patch("llm_client.requests.post")
+    @patch("requests.Session.post")
     def test_json_response_parsing(self, mock_post, client):
         """Test JSON response parsing."""
         test_json = {"name": "test", "value": 123}
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
-        mock_response.json.return_value = {
-            "choices": [{"message": {"content": json.dumps(test_json)}}]
-        }
+        mock_response.content = json.dumps(
+            {"choices": [{"message": {"content": json.dumps(test_json)}}]}
+        ).encode()
         mock_post.return_value = mock_response
 
         result = client.generate_json("prompt")
 
         assert result == test_json
 
-    @patch("llm_client.requests.post")
+    @patch("requests.Session.post")
     def test_json_response_markdown_code_blocks(self, mock_post, client):
         """Test JSON parsing from markdown code blocks."""
         test_json = {"name": "test", "value": 123}
         response_text = f"```json\n{json.dumps(test_json)}\n```"
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
-        mock_response.json.return_value = {
-            "choices": [{"message": {"content": response_text}}]
-        }
+        mock_response.content = json.dumps(
+            {"choices": [{"message": {"content": response_text}}]}
+        ).encode()
         mock_post.return_value = mock_response
 
         result = client.generate_json("prompt")
 
         assert result == test_json
 
-    @patch("llm_client.requests.post")
+    @patch("requests.Session.post")
     def test_retry_on_failure(self, mock_post, client):
         """Test retry logic with connection errors."""
         # Setup mock to fail with RequestException
@@ -141,7 +145,7 @@ class TestLLMClient:
         # Should return None after retries exhausted
         assert response is None
 
-    @patch("llm_client.requests.post")
+    @patch("requests.Session.post")
     def test_max_retries_exceeded(self, mock_post, client):
         """Test that max retries are respected."""
         # All calls fail with connection error
@@ -152,3 +156,281 @@ class TestLLMClient:
 
         # Should return None after max retries
         assert response is None
+
+    @patch("requests.Session.post")
+    def test_retry_resends_serialized_body(self, mock_post, client):
+        """Test retries reuse the same pre-serialized request body."""
+        mock_post.side_effect = requests.exceptions.ConnectionError("Connection failed")
+
+        with patch("time.sleep"):
+            client.call("system", "user", max_retries=2)
+
+        assert mock_post.call_count == 2
+        first, second = (c[1]["data"] for c in mock_post.call_args_list)
+        assert first is second
+        assert json.loads(first)["messages"][1]["content"] == "user"
+
+    @patch("requests.Session.post")
+    def test_json_response_bare_code_fence(self, mock_post, client):
+        """Test JSON parsing from a fence without a language tag."""
+        test_json = {"name": "test", "value": 123}
+        response_text = f"  ```\n{json.dumps(test_json)}\n```\n"
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.content = json.dumps(
+            {"choices": [{"message": {"content": response_text}}]}
+        ).encode()
+        mock_post.return_value = mock_response
+
+        result = client.generate_json("prompt")
+
+        assert result == test_json
+
+    @patch("requests.Session.post")
+    def test_invalid_response_body_retried(self, mock_post, client):
+        """Test a non-JSON response body is treated as a failed attempt."""
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.content = b"<html>Bad Gateway</html>"
+        mock_post.return_value = mock_response
+
+        with patch("time.sleep"):
+            response = client.call("system", "user", max_retries=2)
+
+        assert response is None
+        assert mock_post.call_count == 2
+
+    @staticmethod
+    def _http_error_response(status, headers=None):
+        """Build a mock response whose raise_for_status raises HTTPError."""
+        mock_response = Mock()
+        mock_response.status_code = status
+        mock_response.headers = headers or {}
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            f"{status} Error", response=mock_response
+        )
+        return mock_response
+
+    @patch("requests.Session.post")
+    def test_non_retryable_status_fails_fast(self, mock_post, client):
+        """Test 4xx errors like 401 are not retried."""
+        mock_post.return_value = self._http_error_response(401)
+
+        with patch("time.sleep") as mock_sleep:
+            response = client.call("system", "user", max_retries=3)
+
+        assert response is None
+        assert mock_post.call_count == 1
+        assert not mock_sleep.called
+
+    @patch("requests.Session.post")
+    def test_retry_after_header_honored(self, mock_post, client):
+        """Test 429 responses sleep for the server-provided Retry-After."""
+        mock_post.return_value = self._http_error_response(429, {"Retry-After": "7"})
+
+        with patch("time.sleep") as mock_sleep:
+            response = client.call("system", "user", max_retries=2)
+
+        assert response is None
+        assert mock_post.call_count == 2
+        mock_sleep.assert_called_once_with(7.0)
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("Wed, 21 Oct 2015 07:28:00 -0000", 0.0),
+            ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+            ("99999", LLMClient.RETRY_AFTER_MAX),
+            ("-5", 0.0),
+            ("inf", None),
+            ("nan", None),
+            ("soon", None),
+        ],
+    )
+    def test_parse_retry_after_edge_cases(self, value, expected):
+        """Test naive dates, huge and non-finite Retry-After values are handled."""
+        response = Mock(headers={"Retry-After": value})
+
+        assert LLMClient._parse_retry_after(response) == expected
+
+    @patch("requests.Session.post")
+    def test_retry_after_non_finite_falls_back_to_backoff(self, mock_post, client):
+        """Test an unusable Retry-After still retries with jittered backoff."""
+        mock_post.return_value = self._http_error_response(429, {"Retry-After": "inf"})
+
+        with patch("time.sleep") as mock_sleep:
+            response = client.call("system", "user", max_retries=2)
+
+        assert response is None
+        assert mock_post.call_count == 2
+        assert 0 <= mock_sleep.call_args[0][0] <= client.BACKOFF_BASE
+
+    @patch("requests.Session.post")
+    def test_retry_backoff_jittered(self, mock_post, client):
+        """Test backoff without Retry-After stays within the jitter bounds."""
+        mock_post.return_value = self._http_error_response(503)
+
+        random.seed(0)
+        with patch("time.sleep") as mock_sleep:
+            client.call("system", "user", max_retries=4)
+
+        delays = [c[0][0] for c in mock_sleep.call_args_list]
+        assert len(delays) == 3
+        for attempt, delay in enumerate(delays):
+            ceiling = min(client.BACKOFF_CAP, client.BACKOFF_BASE * 2**attempt)
+            assert 0 <= delay <= ceiling
+        # Jittered, not the fixed exponential schedule
+        assert delays != [1.0, 2.0, 4.0]
+
+    @patch("requests.Session.post")
+    def test_response_parsed_from_raw_bytes(self, mock_post, client):
+        """Test the envelope is parsed from response.content, not .text/.json()."""
+        mock_response = Mock(spec=["raise_for_status", "content"])
+        mock_response.content = b'{"choices": [{"message": {"content": "ok"}}]}'
+        mock_post.return_value = mock_response
+
+        assert client.call("system", "user") == "ok"
+
+    @patch("requests.Session.post")
+    def test_system_messages_cache_control(self, mock_post, client, config):
+        """Test system blocks keep cache_control for Claude and flatten otherwise."""
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.content = json.dumps(
+            {"choices": [{"message": {"content": "ok"}}]}
+        ).encode()
+        mock_post.return_value = mock_response
+
+        blocks = [
+            {
+                "type": "text",
+                "text": "Static. ",
+                "cache_control": {"type": "ephemeral"},
+            },
+            {"type": "text", "text": "Dynamic."},
+        ]
+
+        client.call("ignored", "User", system_messages=blocks)
+        sent = json.loads(mock_post.call_args[1]["data"])
+        assert sent["messages"][0]["content"] == "Static. Dynamic."
+
+        config.llm_model = "claude-3-5-sonnet-20241022"
+        client.call("ignored", "User", system_messages=blocks)
+        sent = json.loads(mock_post.call_args[1]["data"])
+        assert sent["messages"][0]["content"] == blocks
+
+    def test_context_manager_closes_session(self, config):
+        """Test the client closes its pooled session on exit."""
+        with patch("requests.Session.close") as mock_close:
+            with LLMClient(config) as client:
+                assert isinstance(client, LLMClient)
+            mock_close.assert_called_once()
+
+    @patch("requests.Session.post")
+    def test_acall_concurrent(self, mock_post, client):
+        """Test gathered async calls overlap instead of running serially."""
+
+        def slow_post(*args, **kwargs):
+            time.sleep(0.1)
+            response = Mock()
+            response.raise_for_status = Mock()
+            response.content = json.dumps(
+                {"choices": [{"message": {"content": "ok"}}]}
+            ).encode()
+            return response
+
+        mock_post.side_effect = slow_post
+
+        async def run():
+            return await asyncio.gather(
+                *(client.acall("System", f"User {i}") for i in range(10))
+            )
+
+        start = time.monotonic()
+        results = asyncio.run(run())
+        elapsed = time.monotonic() - start
+
+        assert results == ["ok"] * 10
+        assert elapsed < 0.5
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    @patch("requests.Session.post")
+    def test_json_response_parsing_backends(self, mock_post, client, use_orjson):
+        """Test fenced and bare JSON parse the same with and without orjson."""
+        test_json = {"name": "test", "items": ["a", "b"], "value": 1.5}
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_post.return_value = mock_response
+
+        orjson_module = json_codec.orjson if use_orjson else None
+        with patch.object(json_codec, "orjson", orjson_module):
+            for content in (
+                json.dumps(test_json),
+                "```json\n" + json.dumps(test_json) + "\n```",
+            ):
+                mock_response.content = json.dumps(
+                    {"choices": [{"message": {"content": content}}]}
+                ).encode()
+                assert client.generate_json("prompt") == test_json
+
+    @patch("requests.Session.post")
+    def test_json_response_fence_inside_prose(self, mock_post, client):
+        """Test a JSON fence surrounded by prose is extracted."""
+        test_json = {"rules": ["Run ```npm ci``` in CI pipelines"]}
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_post.return_value = mock_response
+
+        for content in (
+            "Here is the skill:\n```json\n" + json.dumps(test_json) + "\n```\nDone.",
+            json.dumps(test_json),
+        ):
+            mock_response.content = json.dumps(
+                {"choices": [{"message": {"content": content}}]}
+            ).encode()
+            assert client.generate_json("prompt") == test_json
+
+    @patch("requests.Session.post")
+    def test_json_trailing_text_tolerated(self, mock_post, client):
+        """Test JSON followed by trailing prose parses, and junk returns None."""
+        test_json = {"name": "test", "items": [1, 2]}
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_post.return_value = mock_response
+
+        for content, expected in (
+            (json.dumps(test_json) + "\n\nLet me know if you need more.", test_json),
+            ("Note [draft]: " + json.dumps(test_json), test_json),
+            (
+                "Per the docs [1], here it is: ```json "
+                + json.dumps(test_json)
+                + "```",
+                test_json,
+            ),
+            ("Schema {} follows: " + json.dumps(test_json), test_json),
+            ("```json\n[1, 2]\n```", [1, 2]),
+            ("No JSON here", None),
+        ):
+            mock_response.content = json.dumps(
+                {"choices": [{"message": {"content": content}}]}
+            ).encode()
+            assert client.generate_json("prompt") == expected
+
+    @patch("requests.Session.post")
+    def test_streaming_response_parsing(self, mock_post, client):
+        """Test a streamed body is assembled from chunks and parsed."""
+        body = json.dumps(
+            {"choices": [{"message": {"content": "Streamed response " * 100}}]}
+        ).encode()
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.iter_content.return_value = [
+            body[i : i + 64] for i in range(0, len(body), 64)
+        ]
+        mock_post.return_value = mock_response
+
+        result = client.call("System", "User", stream=True)
+
+        assert result == "Streamed response " * 100
+        assert mock_post.call_args[1]["stream"] is True
+        mock_response.close.assert_called_once()
@@ -0,0 +1,182 @@
+"""Tests for main module."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from main import SkillRegenerator
+from skill_validator import SkillValidator
+from source_fetcher import FetchedSources
+
+
+class TestSkillRegenerator:
+    """Test SkillRegenerator pipeline stages."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Create test config with every output directory under tmp_path."""
+        cfg = Config()
+        cfg.llm_api_key = "test-key"
+        cfg.skills_dir = tmp_path / "skills"
+        cfg.snapshots_dir = tmp_path / "snapshots"
+        cfg.sources_dir = tmp_path / "sources"
+        cfg.llm_cache_dir = tmp_path / "llm_cache"
+        cfg.snapshots_dir.mkdir()
+        return cfg
+
+    @pytest.fixture
+    def regenerator(self, config):
+        """Create SkillRegenerator."""
+        return SkillRegenerator(config=config)
+
+    @pytest.fixture
+    def documentation(self):
+        """Create documentation content large enough to be sent as a diff."""
+        return "\n".join(f"Line {i} of the documentation" for i in range(200))
+
+    def fetch(self, regenerator, content):
+        """Run fetch_stage for "demo" with the given fetched content."""
+        fetched = FetchedSources(
+            text=content, urls=[], byte_size=len(content.encode("utf-8"))
+        )
+        with patch.object(
+            regenerator.fetcher,
+            "load_source_descriptor",
+            return_value={"sources": ["https://example.com/docs"]},
+        ), patch.object(regenerator.fetcher, "collect_sources", return_value=fetched):
+            return regenerator.fetch_stage("demo")
+
+    def test_fetch_stage_diff_includes_current_skill(
+        self, regenerator, config, documentation
+    ):
+        """Test a small change is sent as a diff next to the current SKILLS.md."""
+        regenerator.fetcher.save_snapshot("demo", documentation)
+        skill_path = config.skill_md_path("demo")
+        skill_path.parent.mkdir(parents=True)
+        skill_path.write_text("# Skill: demo\n", encoding="utf-8")
+
+        job = self.fetch(
+            regenerator, documentation.replace("Line 100 of", "Line 100 is now")
+        )
+
+        assert job["previous_skill"] == "# Skill: demo\n"
+        assert "+Line 100 is now the documentation" in job["diff"]
+
+    def test_fetch_stage_without_current_skill_sends_full_content(
+        self, regenerator, documentation
+    ):
+        """Test a diff is replaced by full content when there is no SKILLS.md."""
+        regenerator.fetcher.save_snapshot("demo", documentation)
+        changed = documentation.replace("Line 100 of", "Line 100 is now")
+
+        job = self.fetch(regenerator, changed)
+
+        assert job["previous_skill"] is None
+        assert job["diff"] == changed
+
+    def test_run_pipeline_runs_every_stage(self, regenerator):
+        """Test each skill flows fetch -> normalize -> write exactly once."""
+        calls = []
+        lock = threading.Lock()
+
+        def stage(name, result):
+            def run(arg):
+                skill_name = arg if isinstance(arg, str) else arg["skill_name"]
+                with lock:
+                    calls.append((name, skill_name))
+                return result(skill_name)
+
+            return run
+
+        with patch.object(
+            regenerator,
+            "fetch_stage",
+            side_effect=stage("fetch", lambda n: {"skill_name": n}),
+        ), patch.object(
+            regenerator,
+            "normalize_stage",
+            side_effect=stage("normalize", lambda n: {"skill_name": n}),
+        ), patch.object(
+            regenerator, "write_stage", side_effect=stage("write", lambda n: True)
+        ):
+            regenerator.run_pipeline(["alpha", "beta", "gamma"])
+
+        for skill_name in ("alpha", "beta", "gamma"):
+            stages = [name for name, skill in calls if skill == skill_name]
+            assert stages == ["fetch", "normalize", "write"]
+
+    def test_run_pipeline_counts_stage_exception_as_failed(self, regenerator):
+        """Test a raising stage fails its skill without stalling the others."""
+
+        def normalize(job):
+            if job["skill_name"] == "broken":
+                raise RuntimeError("boom")
+            return job
+
+        with patch.object(
+            regenerator, "fetch_stage", side_effect=lambda n: {"skill_name": n}
+        ), patch.object(
+            regenerator, "normalize_stage", side_effect=normalize
+        ), patch.object(
+            regenerator, "write_stage", return_value=True
+        ) as mock_write:
+            runner = threading.Thread(
+                target=regenerator.run_pipeline, args=(["ok", "broken", "fine"],)
+            )
+            runner.start()
+            runner.join(timeout=5)
+
+        assert not runner.is_alive()
+        assert regenerator.stats["failed"] == 1
+        assert regenerator.stats["errors"] == ["broken: boom"]
+        assert sorted(c.args[0]["skill_name"] for c in mock_write.call_args_list) == [
+            "fine",
+            "ok",
+        ]
+
+    def test_run_pipeline_stops_after_skipped_stage(self, regenerator):
+        """Test a stage returning None ends that skill's pipeline."""
+        with patch.object(regenerator, "fetch_stage", return_value=None), patch.object(
+            regenerator, "normalize_stage"
+        ) as mock_normalize:
+            regenerator.run_pipeline(["skipped"])
+
+        mock_normalize.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "committed, pushed, saved",
+        [(False, True, False), (True, False, False), (True, True, True)],
+    )
+    def test_snapshots_saved_only_after_commit_and_push(
+        self, regenerator, committed, pushed, saved
+    ):
+        """Test a failed commit or push leaves the skill to be retried next run."""
+        job = {
+            "skill_name": "demo",
+            "source_urls": ["https://example.com/docs"],
+            "content": "Fetched documentation",
+            "normalized": {"name": "demo"},
+        }
+
+        with patch.object(
+            regenerator.config, "validate", return_value=(True, [])
+        ), patch.object(
+            SkillValidator, "validate_skill", return_value=(True, [], [])
+        ), patch.object(
+            regenerator, "save_skill_to_registry", return_value=True
+        ), patch.object(
+            regenerator,
+            "run_pipeline",
+            side_effect=lambda names: regenerator.write_stage(job),
+        ), patch.object(
+            regenerator.git, "create_pr_branch", return_value="generate/skills-test"
+        ), patch.object(
+            regenerator.git, "commit_staged", return_value=committed
+        ), patch.object(
+            regenerator.git, "push_changes", return_value=pushed
+        ):
+            regenerator.regenerate_skills(["demo"])
+
+        assert regenerator.fetcher.get_snapshot_path("demo").exists() is saved
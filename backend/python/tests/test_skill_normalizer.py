@@ -1,11 +1,13 @@
 """Tests for skill_normalizer module."""
 
 import json
+import os
 from unittest.mock import Mock, patch
 
 import pytest
 
-from skill_normalizer import SkillNormalizer
+from skill_normalizer import SkillNormalizer, _iso_now
+from skill_validator import _ISO_RE
 from llm_client import LLMClient
 from config import Config
 
@@ -13,13 +15,16 @@ from config import Config
 class TestSkillNormalizer:
     """Test SkillNormalizer class."""
 
+    SOURCES = ["https://example.com/docs"]
+
     @pytest.fixture
-    def config(self):
+    def config(self, tmp_path):
         """Create test config."""
         cfg = Config()
         cfg.llm_base_url = "http://localhost:8000/v1"
         cfg.llm_model = "test-model"
         cfg.llm_api_key = "test-key"
+        cfg.llm_cache_dir = tmp_path / "llm_cache"
         return cfg
 
     @pytest.fixture
@@ -112,12 +117,83 @@ class TestSkillNormalizer:
                 "tooling": ["tool1"],
             }
 
-            with patch.object(normalizer, "skill_to_markdown"):
+            with patch.object(SkillNormalizer, "skill_to_markdown"):
                 result = normalizer.normalize(large_content, "test", "1.0.0")
 
             # Verify LLM was called (content was truncated)
             assert mock_gen.called
 
+    def test_normalize_diff_switches_prompt(self, normalizer, mock_llm_response):
+        """Test that diff input is sent with the current skill to update."""
+        with patch.object(normalizer.llm, "generate_json") as mock_gen:
+            mock_gen.return_value = mock_llm_response
+
+            normalizer.normalize(
+                "+ new line", "test-skill", previous_skill="# Skill: test-skill\n"
+            )
+            prompt = mock_gen.call_args.args[0]
+            system_prompt = mock_gen.call_args.kwargs["system_prompt"]
+
+            assert "<current_skill>\n# Skill: test-skill\n" in prompt
+            assert "<documentation_diff>\n+ new line\n" in prompt
+            assert system_prompt.endswith(SkillNormalizer.DIFF_PROMPT_ADDENDUM)
+            static_block = mock_gen.call_args.kwargs["system_messages"][0]
+            assert static_block["text"] == SkillNormalizer.SYSTEM_PROMPT
+            assert static_block["cache_control"] == {"type": "ephemeral"}
+
+            normalizer.normalize("plain docs", "test-skill")
+
+            assert "<documentation>" in mock_gen.call_args.args[0]
+            assert (
+                mock_gen.call_args.kwargs["system_prompt"]
+                == SkillNormalizer.SYSTEM_PROMPT
+            )
+
+    def test_normalize_reuses_cached_response(self, normalizer, mock_llm_response):
+        """Test that an identical prompt is answered from the response cache."""
+        with patch.object(normalizer.llm, "generate_json") as mock_gen:
+            mock_gen.return_value = mock_llm_response
+
+            first = normalizer.normalize(
+                "Documentation content", "test-skill", sources=self.SOURCES
+            )
+            second = normalizer.normalize(
+                "Documentation content", "test-skill", sources=self.SOURCES
+            )
+
+            assert first is not None
+            assert second["rules"] == first["rules"]
+            assert mock_gen.call_count == 1
+
+            normalizer.normalize(
+                "Documentation content",
+                "test-skill",
+                sources=self.SOURCES,
+                force_refresh=True,
+            )
+            assert mock_gen.call_count == 2
+
+            normalizer.normalize("Other content", "test-skill", sources=self.SOURCES)
+            assert mock_gen.call_count == 3
+
+    def test_normalize_cache_expires(self, normalizer, config, mock_llm_response):
+        """Test that cached responses older than the TTL are ignored."""
+        config.llm_cache_ttl = 60
+
+        with patch.object(normalizer.llm, "generate_json") as mock_gen:
+            mock_gen.return_value = mock_llm_response
+            normalizer.normalize(
+                "Documentation content", "test-skill", sources=self.SOURCES
+            )
+
+            for path in config.llm_cache_dir.iterdir():
+                os.utime(path, (0, 0))
+
+            normalizer.normalize(
+                "Documentation content", "test-skill", sources=self.SOURCES
+            )
+            assert mock_gen.call_count == 2
+
     @patch.object(SkillNormalizer, "skill_to_markdown")
     def test_normalize_adds_metadata(
         self, mock_markdown, normalizer, mock_llm_response
@@ -193,7 +269,7 @@ class TestSkillNormalizer:
         with patch.object(normalizer.llm, "generate_json") as mock_gen:
             mock_gen.return_value = incomplete_response
 
-            with patch.object(normalizer, "skill_to_markdown"):
+            with patch.object(SkillNormalizer, "skill_to_markdown"):
                 result = normalizer.normalize("Content", "test-skill")
 
             # Should fail validation
@@ -231,3 +307,36 @@ class TestSkillNormalizer:
 
         for section in required_sections:
             assert f"## {section}" in markdown
+
+    def test_skill_to_markdown_skips_empty_sections(
+        self, normalizer, mock_llm_response
+    ):
+        """Test empty or missing list sections get no heading."""
+        mock_llm_response["security"] = []
+        del mock_llm_response["performance"]
+
+        markdown = normalizer.skill_to_markdown(mock_llm_response, [])
+
+        assert "## Security" not in markdown
+        assert "## Performance" not in markdown
+        assert "## Tooling\n- Use pytest for testing\n\n" in markdown
+
+    def test_iso_now_format(self):
+        """Test timestamps match the validator's ISO format."""
+        assert _ISO_RE.match(_iso_now())
+
+    def test_normalize_extracts_source_urls(self, normalizer, mock_llm_response):
+        """Test that URLs in the content become deduplicated sources."""
+        content = (
+            "See https://example.com/docs, and (https://example.com/api).\n"
+            "Again: https://example.com/docs"
+        )
+
+        with patch.object(normalizer.llm, "generate_json") as mock_gen:
+            mock_gen.return_value = mock_llm_response
+            result = normalizer.normalize(content, "test-skill")
+
+        assert result["sources"] == [
+            "https://example.com/docs",
+            "https://example.com/api",
+        ]
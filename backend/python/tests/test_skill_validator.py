@@ -1,8 +1,12 @@
 """Tests for skill_validator module."""
 
+import sys
+from unittest.mock import patch
+
 import pytest
 
-from skill_validator import SkillValidator
+import skill_validator
+from skill_validator import Skill, SkillValidator
 
 
 class TestSkillValidator:
@@ -205,3 +209,114 @@ class TestSkillValidator:
         # validate_json_schema returns (is_valid, errors) tuple
         assert isinstance(result, tuple)
         assert result[0] is False  # Has missing fields
+
+    def test_json_schema_validation_wrong_types(self, validator):
+        """Test JSON schema validation reports wrongly typed fields."""
+        data = {
+            "name": 123,
+            "version": "1.0.0",
+            "purpose": "A test skill for testing purposes",
+            "rules": "Not a list",
+            "patterns": [],
+            "anti_patterns": [],
+            "security": [],
+            "performance": [],
+            "tooling": [],
+        }
+
+        is_valid, errors = validator.validate_json_schema(data)
+
+        assert is_valid is False
+        assert "rules must be a list" in errors
+        assert "name must be a string" in errors
+
+    def test_json_schema_validation_non_dict(self, validator):
+        """Test JSON schema validation rejects non-object JSON."""
+        assert validator.validate_json_schema(["not", "an", "object"]) == (
+            False,
+            ["Expected JSON object"],
+        )
+
+    def test_vague_language_warning_names_word(self, validator, valid_skill):
+        """Test vague-language warnings name the matched whole word only."""
+        valid_skill["rules"] = [
+            "You should use type hints consistently in your code",
+            "Wrap retry-able network calls with timeouts always",
+            "Use canonical import paths for every module you add",
+        ]
+        is_valid, errors, warnings = validator.validate_skill(valid_skill)
+
+        vague = [w for w in warnings if "vague language" in w]
+        assert len(vague) == 1
+        assert 'vague language "should"' in vague[0]
+
+    def test_duplicate_and_non_string_items(self, validator, valid_skill):
+        """Test duplicates warn and non-string items error in the same pass."""
+        valid_skill["rules"].append(valid_skill["rules"][0])
+        valid_skill["tooling"].append({"name": "pytest"})
+
+        is_valid, errors, warnings = validator.validate_skill(valid_skill)
+
+        assert not is_valid
+        assert any("tooling: non-string item" in e for e in errors)
+        assert sum("duplicate item" in w for w in warnings) == 1
+
+    def test_vague_language_case_insensitive(self, validator, valid_skill):
+        """Test capitalized vague words are caught and reported lowercase."""
+        valid_skill["rules"][0] = "Might want to pin dependency versions in lockfiles"
+
+        _, _, warnings = validator.validate_skill(valid_skill)
+
+        assert any('vague language "might"' in w for w in warnings)
+
+    def test_validate_skill_result_cached(self, validator, valid_skill):
+        """Test repeated validation of an equal skill reuses the cached result."""
+        skill_validator._RESULT_CACHE.clear()
+
+        with patch.object(
+            SkillValidator,
+            "_validate_impl",
+            autospec=True,
+            side_effect=SkillValidator._validate_impl,
+        ) as impl:
+            first = validator.validate_skill(valid_skill)
+            first[2].append("caller mutation")
+            second = SkillValidator().validate_skill(dict(valid_skill))
+
+            assert impl.call_count == 1
+            assert second[0] == first[0]
+            assert "caller mutation" not in second[2]
+
+            valid_skill["rules"] = valid_skill["rules"][:1]
+            assert not validator.validate_skill(valid_skill)[0]
+            assert impl.call_count == 2
+
+    def test_validate_skill_cache_keeps_type_errors(self, validator, valid_skill):
+        """Test tuple sections aren't answered from the cached list result."""
+        skill_validator._RESULT_CACHE.clear()
+
+        assert validator.validate_skill(valid_skill)[0]
+
+        as_tuple = {**valid_skill, "rules": tuple(valid_skill["rules"])}
+        is_valid, errors, _ = validator.validate_skill(as_tuple)
+
+        assert not is_valid
+        assert "rules must be a list" in errors
+
+    def test_validate_skill_accepts_skill_object(self, validator, valid_skill):
+        """Test a Skill validates the same as the dict it was built from."""
+        skill = Skill.from_dict(valid_skill)
+
+        assert isinstance(skill.rules, tuple)
+        assert skill.to_dict() == valid_skill
+
+        extended = {**valid_skill, "domains": ["web"], "version_notes": "LTS"}
+        assert Skill.from_dict(extended).to_dict() == extended
+        assert validator.validate_skill(skill) == validator.validate_skill(valid_skill)
+
+    def test_skill_slots_memory(self, valid_skill):
+        """Test a slotted Skill is smaller than the equivalent dict."""
+        skill = Skill.from_dict(valid_skill)
+
+        assert not hasattr(skill, "__dict__")
+        assert sys.getsizeof(skill) < sys.getsizeof(valid_skill)
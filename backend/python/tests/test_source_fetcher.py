@@ -1,13 +1,18 @@
 """Tests for source_fetcher module."""
 
 import json
+import os
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+import requests
 
-from source_fetcher import SourceFetcher
+import json_codec
+import source_fetcher
+from source_fetcher import TRUNCATION_MARKER, SourceFetcher
 from config import Config
 
 
@@ -21,12 +26,16 @@ class TestSourceFetcher:
 
         with tempfile.TemporaryDirectory() as tmpdir:
             cfg.project_root = Path(tmpdir)
+            cfg.snapshots_dir = cfg.project_root / "backend" / "snapshots"
+            cfg.sources_dir = cfg.project_root / "backend" / "sources"
             yield cfg
 
     @pytest.fixture
     def fetcher(self, config):
         """Create SourceFetcher instance."""
-        return SourceFetcher(config, verbose=False)
+        source_fetcher._FAILED_URLS.clear()
+        yield SourceFetcher(config, verbose=False)
+        source_fetcher._FAILED_URLS.clear()
 
     def test_load_source_descriptor(self, fetcher, config):
         """Test loading source descriptor."""
@@ -61,7 +70,10 @@ class TestSourceFetcher:
         """Test successful URL fetch."""
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
-        mock_response.text = "Test content"
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.encoding = "utf-8"
+        mock_response.iter_content.return_value = [b"Test ", b"content"]
         mock_get.return_value = mock_response
 
         content = fetcher.fetch_url("https://example.com")
@@ -74,7 +86,10 @@ class TestSourceFetcher:
         """Test URL fetch with timeout."""
         mock_response = Mock()
         mock_response.raise_for_status = Mock()
-        mock_response.text = "Content"
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.encoding = "utf-8"
+        mock_response.iter_content.return_value = [b"Content"]
         mock_get.return_value = mock_response
 
         content = fetcher.fetch_url("https://example.com", timeout=30)
@@ -83,6 +98,77 @@ class TestSourceFetcher:
         call_kwargs = mock_get.call_args[1]
         assert call_kwargs.get("timeout") == 30
 
+    @patch("requests.Session.get")
+    def test_fetch_url_unknown_charset_falls_back_to_utf8(self, mock_get, fetcher):
+        """Test an unrecognized response charset decodes as UTF-8."""
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.encoding = "utf8mb4"
+        mock_response.iter_content.return_value = ["Café docs".encode("utf-8")]
+        mock_get.return_value = mock_response
+
+        assert fetcher.fetch_url("https://example.com/charset") == "Café docs"
+
+    @patch("requests.Session.get")
+    def test_fetch_url_truncates_at_max_bytes(self, mock_get, fetcher):
+        """Test streamed bodies stop reading once max_bytes is reached."""
+        chunks = [b"a" * 10, b"b" * 10, b"c" * 10]
+        consumed = []
+
+        def iter_content(chunk_size):
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.encoding = "utf-8"
+        mock_response.iter_content.side_effect = iter_content
+        mock_get.return_value = mock_response
+
+        content = fetcher.fetch_url("https://example.com/big", max_bytes=15)
+
+        assert content == "a" * 10 + "b" * 5
+        assert len(consumed) == 2
+        assert mock_get.call_args[1]["stream"] is True
+        assert mock_response.close.called
+
+    @patch("requests.Session.get")
+    def test_fetch_url_conditional_get_not_modified(self, mock_get, fetcher):
+        """Test cached body is reused when the server answers 304."""
+        first = Mock()
+        first.raise_for_status = Mock()
+        first.status_code = 200
+        first.headers = {"ETag": '"abc123"'}
+        first.encoding = "utf-8"
+        first.iter_content.return_value = [b"Cached content"]
+
+        not_modified = Mock()
+        not_modified.status_code = 304
+        not_modified.raise_for_status = Mock(side_effect=AssertionError)
+
+        mock_get.side_effect = [first, not_modified]
+
+        assert fetcher.fetch_url("https://example.com/docs") == "Cached content"
+        assert fetcher.fetch_url("https://example.com/docs") == "Cached content"
+
+        second_headers = mock_get.call_args_list[1][1]["headers"]
+        assert second_headers["If-None-Match"] == '"abc123"'
+
+    def test_save_http_cache_is_atomic(self, fetcher):
+        """Test HTTP cache entries go through the atomic write helper."""
+        response = Mock(headers={"ETag": '"abc123"'})
+        url = "https://example.com/atomic"
+
+        with patch("source_fetcher._atomic_write") as mock_write:
+            fetcher.save_http_cache(url, response, "Body")
+
+        assert mock_write.call_args[0][0] == fetcher.get_http_cache_path(url)
+
     @patch.object(SourceFetcher, "fetch_url")
     def test_fetch_github_file(self, mock_fetch, fetcher):
         """Test GitHub file fetching."""
@@ -123,6 +209,17 @@ class TestSourceFetcher:
 
         assert loaded == content
 
+    def test_snapshot_save_is_atomic(self, fetcher, config):
+        """Test a failed save keeps the previous snapshot and leaves no temp files."""
+        config.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        fetcher.save_snapshot("test-skill", "Old snapshot content")
+
+        with patch("source_fetcher.os.replace", side_effect=OSError("disk full")):
+            assert fetcher.save_snapshot("test-skill", "New snapshot content") is False
+
+        assert fetcher.load_snapshot("test-skill") == "Old snapshot content"
+        assert not list(config.snapshots_dir.glob(".test-skill.*.tmp"))
+
     def test_compute_diff_no_snapshot(self, fetcher, config):
         """Test diff computation with no previous snapshot."""
         content = "New content"
@@ -161,3 +258,192 @@ class TestSourceFetcher:
 
         # Should return new content (changed)
         assert diff == new_content
+
+    def test_compute_diff_small_change_returns_hunks(self, fetcher, config):
+        """Test that a small change in large content is sent as a diff."""
+        lines = [f"Line {i} of the documentation" for i in range(200)]
+        old_content = "\n".join(lines)
+        lines[100] = "Line 100 was rewritten"
+        new_content = "\n".join(lines)
+
+        config.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        fetcher.save_snapshot("test-skill", old_content)
+
+        diff, is_diff = fetcher.compute_change("test-skill", new_content)
+
+        assert is_diff
+        assert "-Line 100 of the documentation" in diff
+        assert "+Line 100 was rewritten" in diff
+        assert len(diff) < len(new_content) / 2
+
+        # compute_diff keeps returning the full content for any change
+        assert fetcher.compute_diff("test-skill", new_content) == new_content
+        assert fetcher.compute_change("test-skill", "Unrelated") == ("Unrelated", False)
+
+    def test_compute_diff_uses_sidecar_digest(self, fetcher, config):
+        """Test that unchanged content is detected without reading the snapshot."""
+        content = "Same content"
+
+        config.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        fetcher.save_snapshot("test-skill", content)
+
+        assert config.snapshots_dir.joinpath("test-skill.sha").read_text() == (
+            fetcher.content_digest(content)
+        )
+
+        with patch.object(fetcher, "load_snapshot") as mock_load:
+            assert fetcher.compute_diff("test-skill", content) is None
+            mock_load.assert_not_called()
+
+    def test_fetch_sources_parallel_keeps_order(self, fetcher, config):
+        """Test sources are fetched concurrently but combined in order."""
+        urls = [f"https://example.com/{i}" for i in range(4)]
+        descriptor = {"sources": [{"type": "url", "url": u} for u in urls]}
+
+        config.sources_dir.mkdir(parents=True, exist_ok=True)
+        (config.sources_dir / "multi-sources.json").write_text(json.dumps(descriptor))
+
+        def slow_fetch(url):
+            # Later URLs finish first
+            time.sleep(0.05 * (len(urls) - int(url[-1])))
+            return f"content of {url} " * 5
+
+        with patch.object(fetcher, "fetch_url", side_effect=slow_fetch):
+            start = time.monotonic()
+            combined = fetcher.fetch_sources("multi")
+            elapsed = time.monotonic() - start
+
+        positions = [combined.index(f"## Source: {u}") for u in urls]
+        assert positions == sorted(positions)
+        assert elapsed < 0.05 * sum(range(1, len(urls) + 1))
+
+    def test_collect_sources_bounded_to_budget(self, fetcher, config):
+        """Test sources are kept in order and the overflowing one is cut."""
+        urls = [f"https://example.com/{i}" for i in range(4)]
+        descriptor = {"sources": [{"type": "url", "url": u} for u in urls]}
+
+        config.sources_dir.mkdir(parents=True, exist_ok=True)
+        (config.sources_dir / "big-sources.json").write_text(json.dumps(descriptor))
+        config.max_content_chars = 500
+
+        def fetch(url):
+            return f"Docs at {url}/guide. " + "x" * 150
+
+        with patch.object(fetcher, "fetch_url", side_effect=fetch):
+            fetched = fetcher.collect_sources("big")
+
+        body = fetched.text[: -len(TRUNCATION_MARKER)]
+        assert len(body) == 500
+        assert fetched.text.endswith(TRUNCATION_MARKER)
+        assert "## Source: https://example.com/2" in fetched.text
+        assert "## Source: https://example.com/3" not in fetched.text
+        assert fetched.urls == [
+            "https://example.com/0",
+            "https://example.com/0/guide",
+            "https://example.com/1",
+            "https://example.com/1/guide",
+            "https://example.com/2",
+        ]
+        assert fetched.byte_size == len(fetched.text.encode("utf-8"))
+
+    @pytest.mark.parametrize("first", ["", "Short intro."])
+    def test_collect_sources_large_second_source_fills_budget(
+        self, fetcher, config, first
+    ):
+        """Test a large source after a failed or small one is cut, not dropped."""
+        descriptor = {
+            "sources": [
+                {"type": "url", "url": "https://example.com/a"},
+                {"type": "url", "url": "https://example.com/b"},
+            ]
+        }
+
+        config.sources_dir.mkdir(parents=True, exist_ok=True)
+        (config.sources_dir / "mixed-sources.json").write_text(json.dumps(descriptor))
+        config.max_content_chars = 1000
+
+        pages = {"https://example.com/a": first, "https://example.com/b": "y" * 5000}
+        with patch.object(fetcher, "fetch_url", side_effect=pages.get):
+            fetched = fetcher.collect_sources("mixed")
+
+        assert fetched is not None
+        assert "## Source: https://example.com/b" in fetched.text
+        assert len(fetched.text) == 1000 + len(TRUNCATION_MARKER)
+
+    def test_compute_diff_backfills_missing_sidecar(self, fetcher, config):
+        """Test a snapshot without a digest sidecar gets one on first compare."""
+        content = "Same content"
+
+        config.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        fetcher.get_snapshot_path("legacy").write_text(content, encoding="utf-8")
+
+        with patch.object(fetcher, "load_snapshot") as mock_load:
+            assert fetcher.compute_diff("legacy", content) is None
+            mock_load.assert_not_called()
+
+        assert fetcher.get_snapshot_path("legacy").with_suffix(".sha").exists()
+
+        with patch.object(fetcher, "load_snapshot") as mock_load:
+            assert fetcher.compute_diff("legacy", content) is None
+            mock_load.assert_not_called()
+
+    def test_snapshot_preserves_line_endings(self, fetcher, config):
+        """Test snapshots are stored byte-for-byte without newline translation."""
+        content = "line one\r\nline two\n"
+
+        config.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        fetcher.save_snapshot("test-skill", content)
+
+        path = fetcher.get_snapshot_path("test-skill")
+        assert path.read_bytes() == content.encode("utf-8")
+        assert fetcher.load_snapshot("test-skill") == content
+        assert fetcher.compute_diff("test-skill", content) is None
+
+    def test_fetchers_share_session(self, fetcher, config):
+        """Test all fetchers reuse one pooled session."""
+        other = SourceFetcher(config)
+
+        assert other.session is fetcher.session
+        assert fetcher.session.headers["User-Agent"] == "AI-Skills-Generator/1.0"
+
+        retry = fetcher.session.get_adapter("https://example.com").max_retries
+        assert retry.total == 3
+        assert 503 in retry.status_forcelist
+
+        huge = Mock(headers={"Retry-After": "99999"})
+        assert retry.get_retry_after(huge) == retry.RETRY_AFTER_MAX
+        assert retry.get_retry_after(Mock(headers={"Retry-After": "2"})) == 2
+        # urllib3 rebuilds Retry objects per attempt; the cap must survive
+        assert retry.increment(method="GET", url="/").get_retry_after(huge) == 60.0
+
+    @patch("requests.Session.get")
+    def test_fetch_url_failure_not_retried_within_ttl(self, mock_get, fetcher):
+        """Test a failed URL is skipped until its failure TTL expires."""
+        mock_get.side_effect = requests.ConnectionError("down")
+
+        assert fetcher.fetch_url("https://example.com/down") is None
+        assert fetcher.fetch_url("https://example.com/down") is None
+        assert mock_get.call_count == 1
+
+        source_fetcher._FAILED_URLS["https://example.com/down"] = 0.0
+        assert fetcher.fetch_url("https://example.com/down") is None
+        assert mock_get.call_count == 2
+
+    def test_load_source_descriptor_cached(self, fetcher, config):
+        """Test descriptors are parsed once until the file changes."""
+        config.sources_dir.mkdir(parents=True, exist_ok=True)
+        path = config.sources_dir / "cached-sources.json"
+        path.write_text(json.dumps({"version": "1.0", "sources": []}))
+
+        with patch("json_codec.loads", wraps=json_codec.loads) as mock_loads:
+            first = fetcher.load_source_descriptor("cached")
+            second = fetcher.load_source_descriptor("cached")
+            assert mock_loads.call_count == 1
+            assert second == first
+
+            path.write_text(json.dumps({"version": "2.0", "sources": []}))
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+            assert fetcher.load_source_descriptor("cached")["version"] == "2.0"
+            assert mock_loads.call_count == 2